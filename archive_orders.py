@@ -0,0 +1,24 @@
+"""Move completed orders of closed sessions into the archive tables"""
+import argparse
+from datetime import datetime, timedelta
+from src.config import config
+from src.database import SessionLocal
+from src.services import ArchiveService
+
+def archive_orders(older_than_hours: int, batch_size: int, max_batches: int = None):
+    db = SessionLocal()
+    try:
+        print(f"Archiving completed orders older than {older_than_hours}h...")
+        older_than = datetime.utcnow() - timedelta(hours=older_than_hours)
+        archived = ArchiveService(db).archive_orders(older_than, batch_size, max_batches)
+        print(f"✅ {archived} orders archived")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--older-than-hours", type=int, default=config.ARCHIVE_AFTER_HOURS)
+    parser.add_argument("--batch-size", type=int, default=config.ARCHIVE_BATCH_SIZE, help="orders per transaction")
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    archive_orders(args.older_than_hours, args.batch_size, args.max_batches)
@@ -0,0 +1,18 @@
+"""Rebuild the sales_hourly rollup from order history"""
+import argparse
+from src.database import SessionLocal
+from src.services import ReportService
+
+def backfill_sales(days: int):
+    db = SessionLocal()
+    try:
+        print("Rebuilding sales rollups...")
+        result = ReportService(db).rebuild_sales_rollups(days=days)
+        print(f"✅ {result['orders']} completed orders rolled up into {result['rows']} rows")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=7, help="days of one store per transaction")
+    backfill_sales(parser.parse_args().days)
@@ -0,0 +1,181 @@
+"""Bulk data generator for load tests
+
+Builds N stores x M tables x K menus plus a closed-order history with
+bulk_insert_mappings and a single precomputed password hash.
+
+Usage:
+    python -m benchmarks.generate_data --stores 5 --tables 30 --menus 60 --orders 20000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+BENCH_PASSWORD = "bench-password"
+CATEGORY_NAMES = ["Main", "Side", "Noodle", "Dessert", "Drink"]
+CHUNK_SIZE = 10000
+
+def _insert(db, model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.bulk_insert_mappings(model, rows[start:start + CHUNK_SIZE])
+
+def _sync_sequences(db, models):
+    """Explicit ids bypass Postgres SERIAL sequences; move them past the data"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    from sqlalchemy import text
+    for model in models:
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+def generate(db, stores: int, tables: int, menus: int, orders: int,
+             items_per_order: int = 3, days: int = 30, seed: int = 42) -> dict:
+    """Fill an empty database; every store gets an 'admin' user and
+    tables numbered 1..tables, all using BENCH_PASSWORD"""
+    from src.models import (
+        Store, AdminUser, TableAuth, TableSession, Category, Menu,
+        Order, OrderItem, OrderStatus
+    )
+    from src.utils import hash_password
+
+    if db.query(Store.id).first():
+        raise RuntimeError("Database is not empty; use --reset to rebuild it")
+
+    rng = random.Random(seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow()
+
+    store_rows, admin_rows, table_rows, category_rows, menu_rows = [], [], [], [], []
+    menus_by_store = {}
+    tables_by_store = {}
+    for store_id in range(1, stores + 1):
+        store_rows.append({"id": store_id, "name": f"Bench Store {store_id}", "created_at": now})
+        admin_rows.append({
+            "id": store_id, "store_id": store_id, "username": "admin",
+            "password_hash": password_hash, "failed_login_attempts": 0
+        })
+
+        tables_by_store[store_id] = []
+        for number in range(1, tables + 1):
+            table_id = len(table_rows) + 1
+            table_rows.append({
+                "id": table_id, "store_id": store_id, "table_number": str(number),
+                "password_hash": password_hash, "failed_login_attempts": 0
+            })
+            tables_by_store[store_id].append(table_id)
+
+        category_ids = []
+        for order_index, name in enumerate(CATEGORY_NAMES, 1):
+            category_id = len(category_rows) + 1
+            category_rows.append({
+                "id": category_id, "store_id": store_id, "name": name, "display_order": order_index
+            })
+            category_ids.append(category_id)
+
+        menus_by_store[store_id] = []
+        for index in range(menus):
+            menu_id = len(menu_rows) + 1
+            row = {
+                "id": menu_id, "store_id": store_id,
+                "category_id": category_ids[index % len(category_ids)],
+                "name": f"Menu {store_id}-{index + 1}",
+                "description": "Generated for load tests",
+                "price": rng.randrange(10, 300) * 100,
+                "display_order": index, "is_available": True
+            }
+            menu_rows.append(row)
+            menus_by_store[store_id].append(row)
+
+    # Closed sessions holding the order history, a few orders per session
+    session_rows, order_rows, item_rows = [], [], []
+    current_session = {}
+    orders_per_session = 4
+    for order_index in range(orders):
+        store_id = order_index % stores + 1
+        if order_index // stores % orders_per_session == 0:
+            created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+            session_rows.append({
+                "id": len(session_rows) + 1,
+                "table_auth_id": rng.choice(tables_by_store[store_id]),
+                "session_token": f"bench-history-{len(session_rows) + 1}",
+                "created_at": created_at,
+                "closed_at": created_at + timedelta(hours=2),
+                "is_active": False,
+                "order_count": 0, "total_amount": 0, "item_count": 0
+            })
+            current_session[store_id] = session_rows[-1]
+        session = current_session[store_id]
+
+        order_id = order_index + 1
+        created_at = session["created_at"] + timedelta(minutes=rng.randrange(120))
+        total = 0
+        for _ in range(items_per_order):
+            menu = rng.choice(menus_by_store[store_id])
+            quantity = rng.randint(1, 3)
+            subtotal = menu["price"] * quantity
+            total += subtotal
+            session["item_count"] += quantity
+            item_rows.append({
+                "order_id": order_id, "menu_id": menu["id"], "menu_name": menu["name"],
+                "menu_price": menu["price"], "quantity": quantity, "subtotal": subtotal,
+                "created_at": created_at
+            })
+        session["order_count"] += 1
+        session["total_amount"] += total
+        order_rows.append({
+            "id": order_id, "store_id": store_id, "table_session_id": session["id"],
+            "order_number": f"HIST-{order_id:010d}", "total_amount": total,
+            "status": OrderStatus.COMPLETED, "created_at": created_at, "updated_at": created_at
+        })
+
+    for model, rows in (
+        (Store, store_rows), (AdminUser, admin_rows), (TableAuth, table_rows),
+        (Category, category_rows), (Menu, menu_rows), (TableSession, session_rows),
+        (Order, order_rows), (OrderItem, item_rows)
+    ):
+        _insert(db, model, rows)
+    _sync_sequences(db, (Store, AdminUser, TableAuth, Category, Menu, TableSession, Order))
+    db.commit()
+
+    return {
+        "stores": stores, "tables": len(table_rows), "menus": len(menu_rows),
+        "sessions": len(session_rows), "orders": len(order_rows), "order_items": len(item_rows)
+    }
+
+def reset_schema():
+    from sqlalchemy import text
+    from src.database import Base, engine
+    from src import schema
+    import src.models  # noqa: F401 - register tables
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    schema.upgrade()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=30)
+    parser.add_argument("--menus", type=int, default=60)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    from src.database import SessionLocal
+    if args.reset:
+        reset_schema()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = generate(db, args.stores, args.tables, args.menus, args.orders, args.items_per_order)
+    finally:
+        db.close()
+    print(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
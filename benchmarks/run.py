@@ -0,0 +1,291 @@
+"""Load-test harness driving the real FastAPI app in-process
+
+Runs a table-login storm, menu browsing, an ordering burst, admin status
+updates and admin dashboard refreshes against a generated dataset, then
+reports throughput and p50/p95/p99 latency per endpoint. Results are
+written as JSON so runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.run --database-url sqlite:///./bench.db --reset
+    python -m benchmarks.run --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import time
+from datetime import datetime
+
+class Recorder:
+    """Collects per-endpoint latencies for one scenario"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.statuses = {}
+        self.started = time.perf_counter()
+
+    async def call(self, client, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+        statuses = self.statuses.setdefault(label, {})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+    def summary(self) -> dict:
+        duration = time.perf_counter() - self.started
+        endpoints = {}
+        for label, samples in self.samples.items():
+            ordered = sorted(samples)
+            endpoints[label] = {
+                "count": len(ordered),
+                "errors": self.errors.get(label, 0),
+                "throughput_rps": round(len(ordered) / duration, 1),
+                "mean_ms": round(sum(ordered) / len(ordered), 2),
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+                "statuses": {str(code): n for code, n in sorted(self.statuses[label].items())},
+            }
+        return {"duration_s": round(duration, 3), "endpoints": endpoints}
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+async def bounded(concurrency: int, calls):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call):
+        async with semaphore:
+            return await call()
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+async def login_storm(client, rec, ctx, args):
+    async def login(store_id, table_number):
+        # Tablets back off on 503 + Retry-After; every attempt is recorded
+        for _ in range(args.login_attempts):
+            response = await rec.call(client, "POST /api/auth/table-login", "POST", "/api/auth/table-login", json={
+                "store_id": store_id, "table_number": table_number, "password": ctx["password"]
+            })
+            if response.status_code != 503:
+                break
+            await asyncio.sleep(min(float(response.headers.get("retry-after", 1)), 1.0))
+        if response.status_code == 200:
+            ctx["sessions"].append((store_id, response.json()["session_token"]))
+
+    await bounded(args.concurrency, [
+        (lambda s=s, t=t: login(s, str(t)))
+        for s in range(1, args.stores + 1) for t in range(1, args.tables + 1)
+    ])
+
+async def menu_browse(client, rec, ctx, args):
+    etags = {}
+
+    async def browse(store_id):
+        headers = {"If-None-Match": etags[store_id]} if store_id in etags else {}
+        response = await rec.call(client, "GET /api/menus", "GET", f"/api/menus?store_id={store_id}", headers=headers)
+        if "etag" in response.headers:
+            etags[store_id] = response.headers["etag"]
+
+    await bounded(args.concurrency, [
+        (lambda s=(i % args.stores) + 1: browse(s)) for i in range(args.requests)
+    ])
+
+async def order_burst(client, rec, ctx, args):
+    rng = random.Random(7)
+
+    async def order(store_id, token):
+        items = [
+            {"menu_id": rng.choice(ctx["menu_ids"][store_id]), "quantity": rng.randint(1, 3)}
+            for _ in range(rng.randint(1, args.max_items))
+        ]
+        response = await rec.call(client, "POST /api/orders", "POST", "/api/orders",
+                                  json={"items": items}, headers={"Authorization": f"Bearer {token}"})
+        if response.status_code == 200:
+            ctx["orders"].append((store_id, response.json()["id"]))
+
+    sessions = ctx["sessions"]
+    await bounded(args.concurrency, [
+        (lambda s=sessions[i % len(sessions)]: order(*s)) for i in range(args.requests)
+    ])
+    await bounded(args.concurrency, [
+        (lambda t=token: rec.call(client, "GET /api/orders", "GET", "/api/orders",
+                                  headers={"Authorization": f"Bearer {t}"}))
+        for _, token in sessions
+    ])
+
+async def admin_status(client, rec, ctx, args):
+    async def advance(store_id, order_id):
+        headers = {"Authorization": f"Bearer {ctx['admin_tokens'][store_id]}"}
+        for status in ("preparing", "completed"):
+            await rec.call(client, "PUT /api/admin/orders/{order_id}/status", "PUT",
+                           f"/api/admin/orders/{order_id}/status", json={"status": status}, headers=headers)
+
+    await bounded(args.concurrency, [
+        (lambda o=o: advance(*o)) for o in ctx["orders"]
+    ])
+
+async def dashboard(client, rec, ctx, args):
+    async def refresh(store_id):
+        headers = {"Authorization": f"Bearer {ctx['admin_tokens'][store_id]}"}
+        url = f"/api/admin/orders?store_id={store_id}&limit=50"
+        cursor = None
+        for _ in range(args.pages):
+            page_url = url + (f"&cursor={cursor}" if cursor else "")
+            response = await rec.call(client, "GET /api/admin/orders", "GET", page_url, headers=headers)
+            cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+            if not cursor:
+                break
+
+    await bounded(args.concurrency, [
+        (lambda s=(i % args.stores) + 1: refresh(s)) for i in range(args.requests // args.pages)
+    ])
+
+SCENARIO_FUNCS = {
+    "login_storm": login_storm,
+    "menu_browse": menu_browse,
+    "order_burst": order_burst,
+    "admin_status": admin_status,
+    "dashboard": dashboard,
+}
+
+async def run_scenarios(args) -> dict:
+    import httpx
+    from src.main import app
+    from src.database import SessionLocal, dispose_engines
+    from src.models import Menu
+    from src.utils import password_pool
+    from benchmarks.generate_data import BENCH_PASSWORD
+
+    db = SessionLocal()
+    try:
+        menu_ids = {}
+        for menu_id, store_id in db.query(Menu.id, Menu.store_id):
+            menu_ids.setdefault(store_id, []).append(menu_id)
+    finally:
+        db.close()
+
+    ctx = {"password": BENCH_PASSWORD, "menu_ids": menu_ids, "sessions": [], "orders": [], "admin_tokens": {}}
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for store_id in range(1, args.stores + 1):
+                response = await client.post("/api/auth/admin-login", json={
+                    "store_id": store_id, "username": "admin", "password": BENCH_PASSWORD
+                })
+                ctx["admin_tokens"][store_id] = response.json()["token"]
+
+            for name in args.scenarios:
+                if name == "order_burst" and not ctx["sessions"]:
+                    await login_storm(client, Recorder(), ctx, args)
+                rec = Recorder()
+                await SCENARIO_FUNCS[name](client, rec, ctx, args)
+                results[name] = rec.summary()
+                print_summary(name, results[name])
+    finally:
+        password_pool.shutdown()
+        await dispose_engines()
+    return results
+
+def print_summary(name: str, summary: dict):
+    print(f"\n== {name} ({summary['duration_s']}s)")
+    print(f"{'endpoint':45} {'count':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, stats in summary["endpoints"].items():
+        print(f"{label:45} {stats['count']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}")
+
+def print_comparison(previous: dict, current: dict):
+    print(f"\n== compared with {previous['meta']['commit']} ({previous['meta']['timestamp']})")
+    for name, summary in current["scenarios"].items():
+        before = previous["scenarios"].get(name, {}).get("endpoints", {})
+        for label, stats in summary["endpoints"].items():
+            if label not in before:
+                continue
+            deltas = [
+                f"{key[:3]} {before[label][key]} -> {stats[key]} ms"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            ]
+            print(f"{name:13} {label:45} " + ", ".join(deltas))
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--reset", action="store_true", help="rebuild the dataset before running")
+    parser.add_argument("--stores", type=int, default=3)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--menus", type=int, default=60)
+    parser.add_argument("--history-orders", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-items", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--login-attempts", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIO_FUNCS), default=list(SCENARIO_FUNCS))
+    parser.add_argument("--output", default="benchmarks/results")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    args = parser.parse_args()
+
+    # src.config reads the environment at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    # Every simulated tablet shares the in-process client address
+    os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "false")
+
+    if args.reset:
+        from benchmarks.generate_data import generate, reset_schema
+        from src.database import SessionLocal
+        reset_schema()
+        db = SessionLocal()
+        try:
+            counts = generate(db, args.stores, args.tables, args.menus, args.history_orders)
+        finally:
+            db.close()
+        print(f"Dataset: {counts}")
+
+    scenarios = asyncio.run(run_scenarios(args))
+
+    from sqlalchemy.engine import make_url
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "database": make_url(args.database_url).render_as_string(hide_password=True),
+            "db_async": os.getenv("DB_ASYNC", "false"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("database_url", "output", "compare")},
+        },
+        "scenarios": scenarios,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{result['meta']['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+
+if __name__ == "__main__":
+    main()
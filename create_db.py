@@ -1,24 +1,29 @@
-"""Database schema creation script"""
-from src.database import engine, Base
-from src.models import (
-    Store, AdminUser, TableAuth, TableSession,
-    Category, Menu, Order, OrderItem
-)
+"""Database schema migration script
 
-def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully!")
-    print("\nCreated tables:")
-    print("- stores")
-    print("- admin_users")
-    print("- table_auths")
-    print("- table_sessions")
-    print("- categories")
-    print("- menus")
-    print("- orders")
-    print("- order_items")
+Brings DATABASE_URL up to the latest Alembic revision. The API no longer
+creates tables when it starts, so run this on every deploy before the
+new code serves traffic.
+"""
+import argparse
+from src import schema
+
+def create_tables(revision: str = "head", sql: bool = False):
+    """Apply migrations up to revision"""
+    if sql:
+        print("-- TableOrder database schema (PostgreSQL), generated from migrations/")
+        print("-- Regenerate: DATABASE_URL=postgresql://... python create_db.py --sql > create_tables.sql")
+        print("-- Apply:      psql -U postgres -d tableorder -f create_tables.sql\n")
+        schema.upgrade(revision=revision, sql=True)
+        return
+    print("Migrating database schema...")
+    if schema.is_unversioned():
+        print(f"Existing tables found without a version; recording them as revision {schema.BASELINE_REVISION}")
+    schema.upgrade(revision=revision)
+    print(f"✅ Database schema at revision {schema.current_revision()}")
 
 if __name__ == "__main__":
-    create_tables()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--revision", default="head", help="target Alembic revision")
+    parser.add_argument("--sql", action="store_true", help="print the migration SQL instead of running it")
+    args = parser.parse_args()
+    create_tables(args.revision, args.sql)
@@ -1,109 +1,276 @@
--- TableOrder Database Schema
--- Run this with: psql -U postgres -d tableorder -f create_tables.sql
-
--- Stores table
-CREATE TABLE IF NOT EXISTS stores (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(100) NOT NULL,
-    description TEXT,
-    logo_url VARCHAR(500),
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+-- TableOrder database schema (PostgreSQL), generated from migrations/
+-- Regenerate: DATABASE_URL=postgresql://... python create_db.py --sql > create_tables.sql
+-- Apply:      psql -U postgres -d tableorder -f create_tables.sql
+
+BEGIN;
+
+CREATE TABLE alembic_version (
+    version_num VARCHAR(32) NOT NULL, 
+    CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num)
+);
+
+-- Running upgrade  -> 0001
+
+CREATE TABLE stores (
+    id SERIAL NOT NULL, 
+    name VARCHAR(100) NOT NULL, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX ix_stores_id ON stores (id);
+
+CREATE TABLE admin_users (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    username VARCHAR(50) NOT NULL, 
+    password_hash VARCHAR(255) NOT NULL, 
+    failed_login_attempts INTEGER, 
+    locked_until TIMESTAMP WITHOUT TIME ZONE, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
+);
+
+CREATE INDEX ix_admin_users_id ON admin_users (id);
+
+CREATE TABLE categories (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    name VARCHAR(50) NOT NULL, 
+    display_order INTEGER, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
+);
+
+CREATE INDEX ix_categories_id ON categories (id);
+
+CREATE TABLE table_auths (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    table_number VARCHAR(20) NOT NULL, 
+    password_hash VARCHAR(255) NOT NULL, 
+    failed_login_attempts INTEGER, 
+    locked_until TIMESTAMP WITHOUT TIME ZONE, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
+);
+
+CREATE INDEX ix_table_auths_id ON table_auths (id);
+
+CREATE TABLE menus (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    category_id INTEGER NOT NULL, 
+    name VARCHAR(100) NOT NULL, 
+    description TEXT, 
+    price INTEGER NOT NULL, 
+    image_url VARCHAR(500), 
+    display_order INTEGER, 
+    is_available BOOLEAN, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(category_id) REFERENCES categories (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
+);
+
+CREATE INDEX ix_menus_id ON menus (id);
+
+CREATE TABLE table_sessions (
+    id SERIAL NOT NULL, 
+    table_auth_id INTEGER NOT NULL, 
+    session_token VARCHAR(255) NOT NULL, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    last_order_at TIMESTAMP WITHOUT TIME ZONE, 
+    expired_at TIMESTAMP WITHOUT TIME ZONE, 
+    closed_at TIMESTAMP WITHOUT TIME ZONE, 
+    is_active BOOLEAN, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(table_auth_id) REFERENCES table_auths (id)
 );
 
--- Admin Users table
-CREATE TABLE IF NOT EXISTS admin_users (
-    id SERIAL PRIMARY KEY,
-    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
-    username VARCHAR(50) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL,
-    full_name VARCHAR(100),
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+CREATE INDEX ix_table_sessions_id ON table_sessions (id);
+
+CREATE UNIQUE INDEX ix_table_sessions_session_token ON table_sessions (session_token);
+
+CREATE TYPE orderstatus AS ENUM ('PENDING', 'PREPARING', 'COMPLETED');
+
+CREATE TABLE orders (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    table_session_id INTEGER NOT NULL, 
+    order_number VARCHAR(20) NOT NULL, 
+    total_amount INTEGER NOT NULL, 
+    status orderstatus, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id), 
+    FOREIGN KEY(table_session_id) REFERENCES table_sessions (id)
 );
 
--- Table Auth table
-CREATE TABLE IF NOT EXISTS table_auths (
-    id SERIAL PRIMARY KEY,
-    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
-    table_number VARCHAR(20) NOT NULL,
-    auth_code VARCHAR(10) UNIQUE NOT NULL,
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(store_id, table_number)
+CREATE INDEX ix_orders_id ON orders (id);
+
+CREATE UNIQUE INDEX ix_orders_order_number ON orders (order_number);
+
+CREATE TABLE order_items (
+    id SERIAL NOT NULL, 
+    order_id INTEGER NOT NULL, 
+    menu_id INTEGER NOT NULL, 
+    menu_name VARCHAR(100) NOT NULL, 
+    menu_price INTEGER NOT NULL, 
+    quantity INTEGER NOT NULL, 
+    subtotal INTEGER NOT NULL, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(menu_id) REFERENCES menus (id), 
+    FOREIGN KEY(order_id) REFERENCES orders (id)
 );
 
--- Table Sessions table
-CREATE TABLE IF NOT EXISTS table_sessions (
-    id SERIAL PRIMARY KEY,
-    table_auth_id INTEGER NOT NULL REFERENCES table_auths(id) ON DELETE CASCADE,
-    session_token VARCHAR(255) UNIQUE NOT NULL,
-    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    last_order_at TIMESTAMP,
-    ended_at TIMESTAMP,
-    is_active BOOLEAN DEFAULT TRUE
+CREATE INDEX ix_order_items_id ON order_items (id);
+
+INSERT INTO alembic_version (version_num) VALUES ('0001') RETURNING alembic_version.version_num;
+
+-- Running upgrade 0001 -> 0002
+
+ALTER TABLE table_sessions ADD COLUMN order_count INTEGER DEFAULT '0' NOT NULL;
+
+ALTER TABLE table_sessions ADD COLUMN total_amount INTEGER DEFAULT '0' NOT NULL;
+
+ALTER TABLE table_sessions ADD COLUMN item_count INTEGER DEFAULT '0' NOT NULL;
+
+UPDATE table_sessions SET order_count = (SELECT count(*) FROM orders WHERE orders.table_session_id = table_sessions.id), total_amount = (SELECT coalesce(sum(orders.total_amount), 0) FROM orders WHERE orders.table_session_id = table_sessions.id), item_count = (SELECT coalesce(sum(order_items.quantity), 0) FROM order_items JOIN orders ON orders.id = order_items.order_id WHERE orders.table_session_id = table_sessions.id);
+
+CREATE INDEX ix_table_sessions_active_expired ON table_sessions (is_active, expired_at);
+
+CREATE INDEX ix_table_sessions_table_active ON table_sessions (table_auth_id, is_active);
+
+UPDATE alembic_version SET version_num='0002' WHERE alembic_version.version_num = '0001';
+
+-- Running upgrade 0002 -> 0003
+
+ALTER TABLE orders ALTER COLUMN order_number TYPE VARCHAR(32);
+
+CREATE TABLE order_sequences (
+    store_id INTEGER NOT NULL, 
+    business_date VARCHAR(8) NOT NULL, 
+    next_value INTEGER NOT NULL, 
+    PRIMARY KEY (store_id, business_date), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
 );
 
--- Categories table
-CREATE TABLE IF NOT EXISTS categories (
-    id SERIAL PRIMARY KEY,
-    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
-    name VARCHAR(100) NOT NULL,
-    description TEXT,
-    display_order INTEGER DEFAULT 0,
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+UPDATE alembic_version SET version_num='0003' WHERE alembic_version.version_num = '0002';
+
+-- Running upgrade 0003 -> 0004
+
+CREATE TABLE idempotency_keys (
+    key VARCHAR(255) NOT NULL, 
+    fingerprint VARCHAR(64) NOT NULL, 
+    status VARCHAR(16) NOT NULL, 
+    status_code INTEGER, 
+    response_body TEXT, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, 
+    PRIMARY KEY (key)
 );
 
--- Menus table
-CREATE TABLE IF NOT EXISTS menus (
-    id SERIAL PRIMARY KEY,
-    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
-    category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
-    name VARCHAR(100) NOT NULL,
-    description TEXT,
-    price DECIMAL(10, 2) NOT NULL,
-    image_url VARCHAR(500),
-    is_available BOOLEAN DEFAULT TRUE,
-    display_order INTEGER DEFAULT 0,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+CREATE INDEX ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+UPDATE alembic_version SET version_num='0004' WHERE alembic_version.version_num = '0003';
+
+-- Running upgrade 0004 -> 0005
+
+CREATE INDEX ix_orders_store_created_id ON orders (store_id, created_at, id);
+
+CREATE INDEX ix_order_items_order_id ON order_items (order_id);
+
+UPDATE alembic_version SET version_num='0005' WHERE alembic_version.version_num = '0004';
+
+-- Running upgrade 0005 -> 0006
+
+CREATE TABLE sales_hourly (
+    store_id INTEGER NOT NULL, 
+    sales_date DATE NOT NULL, 
+    hour INTEGER NOT NULL, 
+    menu_id INTEGER NOT NULL, 
+    category_id INTEGER, 
+    menu_name VARCHAR(100) NOT NULL, 
+    quantity INTEGER NOT NULL, 
+    revenue INTEGER NOT NULL, 
+    order_count INTEGER NOT NULL, 
+    PRIMARY KEY (store_id, sales_date, hour, menu_id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id)
 );
 
--- Orders table
-CREATE TABLE IF NOT EXISTS orders (
-    id SERIAL PRIMARY KEY,
-    table_session_id INTEGER NOT NULL REFERENCES table_sessions(id) ON DELETE CASCADE,
-    order_number VARCHAR(50) UNIQUE NOT NULL,
-    status VARCHAR(20) DEFAULT 'pending',
-    total_amount DECIMAL(10, 2) DEFAULT 0,
-    notes TEXT,
-    ordered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    completed_at TIMESTAMP
+UPDATE alembic_version SET version_num='0006' WHERE alembic_version.version_num = '0005';
+
+-- Running upgrade 0006 -> 0007
+
+CREATE TABLE orders_archive (
+    id SERIAL NOT NULL, 
+    store_id INTEGER NOT NULL, 
+    table_session_id INTEGER NOT NULL, 
+    order_number VARCHAR(32) NOT NULL, 
+    total_amount INTEGER NOT NULL, 
+    status orderstatus NOT NULL, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    updated_at TIMESTAMP WITHOUT TIME ZONE, 
+    archived_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(store_id) REFERENCES stores (id), 
+    FOREIGN KEY(table_session_id) REFERENCES table_sessions (id), 
+    UNIQUE (order_number)
 );
 
--- Order Items table
-CREATE TABLE IF NOT EXISTS order_items (
-    id SERIAL PRIMARY KEY,
-    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-    menu_id INTEGER NOT NULL REFERENCES menus(id),
-    quantity INTEGER NOT NULL DEFAULT 1,
-    unit_price DECIMAL(10, 2) NOT NULL,
-    subtotal DECIMAL(10, 2) NOT NULL,
-    notes TEXT
+CREATE INDEX ix_orders_archive_store_created_id ON orders_archive (store_id, created_at, id);
+
+CREATE INDEX ix_orders_archive_table_session_id ON orders_archive (table_session_id);
+
+CREATE TABLE order_items_archive (
+    id SERIAL NOT NULL, 
+    order_id INTEGER NOT NULL, 
+    menu_id INTEGER NOT NULL, 
+    menu_name VARCHAR(100) NOT NULL, 
+    menu_price INTEGER NOT NULL, 
+    quantity INTEGER NOT NULL, 
+    subtotal INTEGER NOT NULL, 
+    created_at TIMESTAMP WITHOUT TIME ZONE, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(order_id) REFERENCES orders_archive (id)
 );
 
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_admin_users_store_id ON admin_users(store_id);
-CREATE INDEX IF NOT EXISTS idx_table_auths_store_id ON table_auths(store_id);
-CREATE INDEX IF NOT EXISTS idx_table_sessions_table_auth_id ON table_sessions(table_auth_id);
-CREATE INDEX IF NOT EXISTS idx_categories_store_id ON categories(store_id);
-CREATE INDEX IF NOT EXISTS idx_menus_store_id ON menus(store_id);
-CREATE INDEX IF NOT EXISTS idx_menus_category_id ON menus(category_id);
-CREATE INDEX IF NOT EXISTS idx_orders_table_session_id ON orders(table_session_id);
-CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items(order_id);
-CREATE INDEX IF NOT EXISTS idx_order_items_menu_id ON order_items(menu_id);
+CREATE INDEX ix_order_items_archive_order_id ON order_items_archive (order_id);
+
+UPDATE alembic_version SET version_num='0007' WHERE alembic_version.version_num = '0006';
+
+-- Running upgrade 0007 -> 0008
+
+CREATE UNIQUE INDEX ix_table_auths_store_table ON table_auths (store_id, table_number);
+
+CREATE UNIQUE INDEX ix_admin_users_store_username ON admin_users (store_id, username);
+
+CREATE INDEX ix_categories_store_order ON categories (store_id, display_order);
+
+CREATE INDEX ix_menus_store_available_category_order ON menus (store_id, is_available, category_id, display_order);
+
+CREATE INDEX ix_orders_session_created ON orders (table_session_id, created_at);
+
+CREATE INDEX ix_orders_status ON orders (status);
+
+UPDATE alembic_version SET version_num='0008' WHERE alembic_version.version_num = '0007';
+
+-- Running upgrade 0008 -> 0009
+
+ALTER TABLE menus ADD COLUMN image_digest VARCHAR(32);
+
+UPDATE alembic_version SET version_num='0009' WHERE alembic_version.version_num = '0008';
+
+COMMIT;
+
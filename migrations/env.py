@@ -0,0 +1,46 @@
+"""Alembic environment: runs migrations against config.DATABASE_URL"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import pool
+from src.config import config
+from src.database import Base, create_db_engine
+import src.models  # noqa: F401 - register tables on Base.metadata
+
+target_metadata = Base.metadata
+
+# The alembic CLI logs per ini file; src.schema leaves the app's logging alone
+if context.config.config_file_name and context.config.attributes.get("configure_logger", True):
+    fileConfig(context.config.config_file_name)
+
+def database_url() -> str:
+    # An explicit sqlalchemy.url (e.g. set by tests) wins over the environment
+    return context.config.get_main_option("sqlalchemy.url") or config.DATABASE_URL
+
+def run_migrations_offline():
+    """Emit the SQL script instead of running it (alembic upgrade head --sql)"""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    engine = create_db_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can only alter tables by copying them
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
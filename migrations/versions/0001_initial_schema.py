@@ -0,0 +1,167 @@
+"""initial schema
+
+The original schema, as Base.metadata.create_all built it before any of
+the later revisions. Unversioned databases are stamped here and upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stores_id', 'stores', ['id'], unique=False)
+
+    op.create_table('admin_users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('failed_login_attempts', sa.Integer(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_admin_users_id', 'admin_users', ['id'], unique=False)
+
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'], unique=False)
+
+    op.create_table('table_auths',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('table_number', sa.String(length=20), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('failed_login_attempts', sa.Integer(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_table_auths_id', 'table_auths', ['id'], unique=False)
+
+    op.create_table('menus',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_menus_id', 'menus', ['id'], unique=False)
+
+    op.create_table('table_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_auth_id', sa.Integer(), nullable=False),
+    sa.Column('session_token', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_order_at', sa.DateTime(), nullable=True),
+    sa.Column('expired_at', sa.DateTime(), nullable=True),
+    sa.Column('closed_at', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['table_auth_id'], ['table_auths.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_table_sessions_id', 'table_sessions', ['id'], unique=False)
+    op.create_index('ix_table_sessions_session_token', 'table_sessions', ['session_token'], unique=True)
+
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('table_session_id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(length=20), nullable=False),
+    sa.Column('total_amount', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PREPARING', 'COMPLETED', name='orderstatus'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.ForeignKeyConstraint(['table_session_id'], ['table_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_id', 'orders', ['id'], unique=False)
+    op.create_index('ix_orders_order_number', 'orders', ['order_number'], unique=True)
+
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('menu_name', sa.String(length=100), nullable=False),
+    sa.Column('menu_price', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('subtotal', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_id'], ['menus.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_items_id', 'order_items', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_id', table_name='order_items')
+    op.drop_table('order_items')
+
+    op.drop_index('ix_orders_order_number', table_name='orders')
+    op.drop_index('ix_orders_id', table_name='orders')
+    op.drop_table('orders')
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('DROP TYPE orderstatus')
+
+    op.drop_index('ix_table_sessions_session_token', table_name='table_sessions')
+    op.drop_index('ix_table_sessions_id', table_name='table_sessions')
+    op.drop_table('table_sessions')
+
+    op.drop_index('ix_menus_id', table_name='menus')
+    op.drop_table('menus')
+
+    op.drop_index('ix_table_auths_id', table_name='table_auths')
+    op.drop_table('table_auths')
+
+    op.drop_index('ix_categories_id', table_name='categories')
+    op.drop_table('categories')
+
+    op.drop_index('ix_admin_users_id', table_name='admin_users')
+    op.drop_table('admin_users')
+
+    op.drop_index('ix_stores_id', table_name='stores')
+    op.drop_table('stores')
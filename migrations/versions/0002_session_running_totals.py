@@ -0,0 +1,53 @@
+"""session running totals
+
+Running order totals on table_sessions, filled in from existing orders,
+and the indexes behind the expiry sweep and the table overview.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.schema import existing_columns, existing_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'order_count' not in existing_columns('table_sessions'):
+        with op.batch_alter_table('table_sessions') as batch_op:
+            batch_op.add_column(sa.Column('order_count', sa.Integer(), server_default='0', nullable=False))
+            batch_op.add_column(sa.Column('total_amount', sa.Integer(), server_default='0', nullable=False))
+            batch_op.add_column(sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(
+            "UPDATE table_sessions SET "
+            "order_count = (SELECT count(*) FROM orders WHERE orders.table_session_id = table_sessions.id), "
+            "total_amount = (SELECT coalesce(sum(orders.total_amount), 0) FROM orders "
+            "WHERE orders.table_session_id = table_sessions.id), "
+            "item_count = (SELECT coalesce(sum(order_items.quantity), 0) FROM order_items "
+            "JOIN orders ON orders.id = order_items.order_id WHERE orders.table_session_id = table_sessions.id)"
+        )
+    indexes = existing_indexes('table_sessions')
+    if 'ix_table_sessions_active_expired' not in indexes:
+        op.create_index('ix_table_sessions_active_expired', 'table_sessions', ['is_active', 'expired_at'], unique=False)
+    if 'ix_table_sessions_table_active' not in indexes:
+        op.create_index('ix_table_sessions_table_active', 'table_sessions', ['table_auth_id', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_table_sessions_table_active', table_name='table_sessions')
+    op.drop_index('ix_table_sessions_active_expired', table_name='table_sessions')
+    with op.batch_alter_table('table_sessions') as batch_op:
+        batch_op.drop_column('item_count')
+        batch_op.drop_column('total_amount')
+        batch_op.drop_column('order_count')
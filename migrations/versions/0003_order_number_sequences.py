@@ -0,0 +1,45 @@
+"""order number sequences
+
+Per-store, per-day order number counters. Numbers now look like
+ORD-YYYYMMDD-<store>-NNNN, which does not fit the old VARCHAR(20).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.schema import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.alter_column('order_number', existing_type=sa.String(length=20),
+                              type_=sa.String(length=32), existing_nullable=False)
+    if 'order_sequences' not in existing_tables():
+        op.create_table('order_sequences',
+        sa.Column('store_id', sa.Integer(), nullable=False),
+        sa.Column('business_date', sa.String(length=8), nullable=False),
+        sa.Column('next_value', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+        sa.PrimaryKeyConstraint('store_id', 'business_date')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('order_sequences')
+    # Fails while longer order numbers are stored
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.alter_column('order_number', existing_type=sa.String(length=32),
+                              type_=sa.String(length=20), existing_nullable=False)
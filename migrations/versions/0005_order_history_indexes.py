@@ -0,0 +1,33 @@
+"""order history indexes
+
+Keyset pagination of a store's orders and item lookups by order.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.schema import existing_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'ix_orders_store_created_id' not in existing_indexes('orders'):
+        op.create_index('ix_orders_store_created_id', 'orders', ['store_id', 'created_at', 'id'], unique=False)
+    if 'ix_order_items_order_id' not in existing_indexes('order_items'):
+        op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_store_created_id', table_name='orders')
@@ -0,0 +1,45 @@
+"""sales rollup
+
+Hourly sales per store and menu. Existing completed orders are not
+rolled up here; run python backfill_sales.py after upgrading.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:25:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.schema import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'sales_hourly' in existing_tables():
+        return
+    op.create_table('sales_hourly',
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('sales_date', sa.Date(), nullable=False),
+    sa.Column('hour', sa.Integer(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('menu_name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('store_id', 'sales_date', 'hour', 'menu_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sales_hourly')
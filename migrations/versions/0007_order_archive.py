@@ -0,0 +1,68 @@
+"""order archive
+
+Cold tables that archive_orders.py moves finished orders into.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.schema import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = existing_tables()
+    if 'orders_archive' not in tables:
+        op.create_table('orders_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('store_id', sa.Integer(), nullable=False),
+        sa.Column('table_session_id', sa.Integer(), nullable=False),
+        sa.Column('order_number', sa.String(length=32), nullable=False),
+        sa.Column('total_amount', sa.Integer(), nullable=False),
+        # The orderstatus type already exists with the orders table
+        sa.Column('status', postgresql.ENUM('PENDING', 'PREPARING', 'COMPLETED', name='orderstatus', create_type=False), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+        sa.ForeignKeyConstraint(['table_session_id'], ['table_sessions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('order_number')
+        )
+        op.create_index('ix_orders_archive_store_created_id', 'orders_archive', ['store_id', 'created_at', 'id'], unique=False)
+        op.create_index('ix_orders_archive_table_session_id', 'orders_archive', ['table_session_id'], unique=False)
+    if 'order_items_archive' not in tables:
+        op.create_table('order_items_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('menu_id', sa.Integer(), nullable=False),
+        sa.Column('menu_name', sa.String(length=100), nullable=False),
+        sa.Column('menu_price', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('subtotal', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['order_id'], ['orders_archive.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_order_items_archive_order_id', 'order_items_archive', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_archive_order_id', table_name='order_items_archive')
+    op.drop_table('order_items_archive')
+    op.drop_index('ix_orders_archive_table_session_id', table_name='orders_archive')
+    op.drop_index('ix_orders_archive_store_created_id', table_name='orders_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,41 @@
+"""query indexes
+
+Composite indexes for the login lookups, the customer menu and a table
+session's order history, plus orders.status for the kitchen board rebuild.
+The unique indexes fail on databases holding duplicate tables or admins
+within a store; remove those rows before upgrading.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_table_auths_store_table', 'table_auths', ['store_id', 'table_number'], unique=True)
+    op.create_index('ix_admin_users_store_username', 'admin_users', ['store_id', 'username'], unique=True)
+    op.create_index('ix_categories_store_order', 'categories', ['store_id', 'display_order'], unique=False)
+    op.create_index('ix_menus_store_available_category_order', 'menus',
+                    ['store_id', 'is_available', 'category_id', 'display_order'], unique=False)
+    op.create_index('ix_orders_session_created', 'orders', ['table_session_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_status', 'orders', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_status', table_name='orders')
+    op.drop_index('ix_orders_session_created', table_name='orders')
+    op.drop_index('ix_menus_store_available_category_order', table_name='menus')
+    op.drop_index('ix_categories_store_order', table_name='categories')
+    op.drop_index('ix_admin_users_store_username', table_name='admin_users')
+    op.drop_index('ix_table_auths_store_table', table_name='table_auths')
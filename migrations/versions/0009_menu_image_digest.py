@@ -0,0 +1,35 @@
+"""menu image digest
+
+Digest of each menu's image, stored when the image is saved so menu
+payloads never read originals. Run python prepare_images.py after
+upgrading to fill it in for existing menus.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.schema import existing_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'image_digest' not in existing_columns('menus'):
+        with op.batch_alter_table('menus') as batch_op:
+            batch_op.add_column(sa.Column('image_digest', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('menus') as batch_op:
+        batch_op.drop_column('image_digest')
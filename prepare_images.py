@@ -0,0 +1,15 @@
+"""Render image variants and store digests for menus saved without them"""
+from src.database import SessionLocal
+from src.services import MenuService
+
+def prepare_images():
+    db = SessionLocal()
+    try:
+        print("Preparing menu images...")
+        prepared = MenuService(db).prepare_menu_images()
+        print(f"✅ {prepared} menus now link to image variants")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    prepare_images()
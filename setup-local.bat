@@ -70,7 +70,7 @@ echo.
 echo Next Steps:
 echo 1. Install PostgreSQL and create 'tableorder' database
 echo 2. Update .env file with your PostgreSQL password
-echo 3. Run: python -c "from src.database import engine, Base; from src.models import *; Base.metadata.create_all(bind=engine)"
+echo 3. Run: python create_db.py  (applies database migrations)
 echo 4. Install Frontend dependencies:
 echo    - cd customer-frontend ^&^& npm install
 echo    - cd admin-frontend ^&^& npm install
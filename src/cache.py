@@ -0,0 +1,130 @@
+"""In-process caches for hot read paths"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from src.config import config
+from src.utils import calculate_expiry_time
+
+class MenuSnapshot:
+    """Pre-serialized menu payload for one store"""
+    __slots__ = ("version", "body", "etag", "built_at")
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.built_at = time.monotonic()
+
+class MenuSnapshotCache:
+    """Per-store menu snapshots, versioned by MenuService writes
+
+    Invalidation is in-process only, so with several workers a snapshot
+    may be served for up to MENU_CACHE_TTL_SECONDS after a change made
+    in another worker.
+    """
+
+    def __init__(self, ttl_seconds: int = None):
+        self.ttl_seconds = config.MENU_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._snapshots = {}
+
+    def get(self, store_id: int, build) -> MenuSnapshot:
+        """Return the current snapshot, building it with build() on a miss"""
+        with self._lock:
+            version = self._versions.get(store_id, 0)
+            snapshot = self._snapshots.get(store_id)
+        if snapshot and snapshot.version == version and not self._expired(snapshot):
+            return snapshot
+
+        payload = build()
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        snapshot = MenuSnapshot(version, body)
+        with self._lock:
+            # Do not store a snapshot that a concurrent write already made stale
+            if self._versions.get(store_id, 0) == version:
+                self._snapshots[store_id] = snapshot
+        return snapshot
+
+    def invalidate(self, store_id: int):
+        with self._lock:
+            self._versions[store_id] = self._versions.get(store_id, 0) + 1
+            self._snapshots.pop(store_id, None)
+
+    def version(self, store_id: int) -> int:
+        with self._lock:
+            return self._versions.get(store_id, 0)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._snapshots.clear()
+
+    def _expired(self, snapshot: MenuSnapshot) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - snapshot.built_at > self.ttl_seconds
+
+class VerifiedSession:
+    """Detached view of a verified table session, safe to share across requests"""
+    __slots__ = (
+        "id", "session_token", "table_auth_id", "store_id", "table_number",
+        "created_at", "last_order_at", "expires_at", "cached_at"
+    )
+
+    def __init__(self, session, store_id: int, table_number: str):
+        self.id = session.id
+        self.session_token = session.session_token
+        self.table_auth_id = session.table_auth_id
+        self.store_id = store_id
+        self.table_number = table_number
+        self.created_at = session.created_at
+        self.last_order_at = session.last_order_at
+        self.expires_at = session.expired_at or calculate_expiry_time(
+            session.created_at, session.last_order_at
+        )
+        self.cached_at = time.monotonic()
+
+class SessionCache:
+    """Bounded LRU of verified sessions keyed by token
+
+    Entries live at most SESSION_CACHE_TTL_SECONDS so that a session closed
+    by another worker stops being accepted shortly afterwards.
+    """
+
+    def __init__(self, max_size: int = None, ttl_seconds: int = None):
+        self.max_size = max_size or config.SESSION_CACHE_MAX_SIZE
+        self.ttl_seconds = config.SESSION_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, token: str):
+        with self._lock:
+            session = self._entries.get(token)
+            if session is None:
+                return None
+            if time.monotonic() - session.cached_at > self.ttl_seconds:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return session
+
+    def put(self, session: VerifiedSession):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[session.session_token] = session
+            self._entries.move_to_end(session.session_token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+menu_cache = MenuSnapshotCache()
+session_cache = SessionCache()
@@ -1,21 +1,193 @@
 """Database configuration and session management"""
 import os
-from sqlalchemy import create_engine
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from src.config import config
+from src import metrics
 
-# SQLite configuration for local development
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite specific
-    echo=False
+class CheckoutTimingMixin:
+    """Records how long callers wait for a connection from the pool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def is_memory_sqlite(url) -> bool:
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory" or (
+        "mode=memory" in (url.database or "")
+    )
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine / create_async_engine per dialect"""
+    parsed = make_url(url)
+    options = {"echo": False}
+    if is_memory_sqlite(parsed):
+        # A memory database lives in one connection; keep SQLAlchemy's default pool
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+    
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    if parsed.get_backend_name() == "sqlite":
+        # busy_timeout is applied as a pragma so both drivers get it
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
+def create_db_engine(url: str, is_async: bool = False, **overrides):
+    """Build an engine with pool and connection settings suited to its dialect"""
+    options = {**engine_options(url, is_async), **overrides}
+    if options.get("poolclass") is NullPool:
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key, None)
+    if is_async:
+        db_engine = create_async_engine(url, **options)
+        sync_engine = db_engine.sync_engine
+    else:
+        db_engine = sync_engine = create_engine(url, **options)
+    
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and not is_memory_sqlite(parsed):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+def pool_stats(db_engine=None) -> dict:
+    """Pool occupancy for diagnostics"""
+    pool = (db_engine or engine).pool
+    stats = {"class": type(pool).__name__, "checked_out": pool.checkedout()}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_in=pool.checkedin(), overflow=pool.overflow())
+    return stats
+
+engine = create_db_engine(config.DATABASE_URL)
+
+db_pool_checked_out = metrics.Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool",
+    callback=lambda: engine.pool.checkedout()
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+class QueryStats:
+    """Queries issued while a request (or test block) is being tracked"""
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int) -> list:
+        """Statements run at least threshold times, the usual N+1 signature"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+_query_stats = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries():
+    """Count statements and DB time for everything run inside the block
+
+    The stats object is shared by reference, so threadpool workers and
+    async sessions started from this context report into it as well.
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - started.pop()
+    stats.statements[statement] += 1
+
+# Async drivers used when DB_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    """Create the async engine on first use so sync-only setups need no async driver"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_db_engine(to_async_url(config.DATABASE_URL), is_async=True)
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=True
+        )
+    return _async_engine
+
+async def dispose_engines():
+    """Close pooled connections; aiosqlite keeps a non-daemon thread per connection"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    engine.dispose()
+
 def get_db():
     """Dependency for FastAPI to get database session"""
     db = SessionLocal()
@@ -23,3 +195,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency for FastAPI to get an AsyncSession"""
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+# Session dependency for endpoints that can run on the event loop
+get_request_db = get_async_db if config.DB_ASYNC else get_db
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run sync ORM code against either kind of session
+
+    With an AsyncSession the code runs on the event loop through run_sync;
+    with a plain Session it is pushed to the threadpool as before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
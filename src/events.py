@@ -0,0 +1,133 @@
+"""In-process order event fan-out for admin SSE streams"""
+import asyncio
+import json
+import secrets
+import threading
+from collections import deque
+from datetime import datetime
+from src.config import config
+
+class OrderEvent:
+    """Single event, serialized once and shared by every subscriber"""
+    __slots__ = ("epoch", "id", "store_id", "event", "data")
+
+    def __init__(self, epoch: str, event_id: int, store_id: int, event: str, payload: dict):
+        self.epoch = epoch
+        self.id = event_id
+        self.store_id = store_id
+        self.event = event
+        self.data = json.dumps(payload, default=_json_default, ensure_ascii=False)
+
+    def to_sse(self) -> dict:
+        return {"id": f"{self.epoch}-{self.id}", "event": self.event, "data": self.data}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class Subscriber:
+    """One admin connection with its own bounded queue"""
+
+    def __init__(self, store_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.store_id = store_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def offer(self, event: OrderEvent):
+        """Enqueue on the subscriber's loop; a lagging consumer is cut off"""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog and end the stream; the client reconnects
+            # with Last-Event-ID and catches up from the replay buffer.
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> OrderEvent:
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+class OrderEventBroker:
+    """Per-store pub/sub with a bounded replay buffer for Last-Event-ID resume
+
+    The buffer belongs to one worker process. Emitted ids carry a random
+    epoch chosen at startup, so an id from before a restart or from
+    another worker is recognised and answered with a resync.
+    """
+
+    def __init__(self, queue_size: int = None, replay_size: int = None):
+        self.queue_size = queue_size or config.SSE_QUEUE_SIZE
+        self.replay_size = replay_size or config.SSE_REPLAY_SIZE
+        self._lock = threading.Lock()
+        self.epoch = secrets.token_hex(4)
+        self._last_id = 0
+        self._subscribers = {}
+        self._history = {}
+        self._evicted = {}
+
+    def publish(self, store_id: int, event: str, payload: dict) -> OrderEvent:
+        """Publish an event; safe to call from worker threads"""
+        with self._lock:
+            self._last_id += 1
+            order_event = OrderEvent(self.epoch, self._last_id, store_id, event, payload)
+            history = self._history.get(store_id)
+            if history is None:
+                history = self._history[store_id] = deque(maxlen=self.replay_size)
+            if len(history) == history.maxlen:
+                self._evicted[store_id] = history[0].id
+            history.append(order_event)
+            subscribers = list(self._subscribers.get(store_id, ()))
+
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, order_event)
+        return order_event
+
+    def parse_event_id(self, event_id: str):
+        """Sequence number of an id this broker emitted, or None for any other id"""
+        epoch, _, sequence = (event_id or "").partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, store_id: int, last_event_id: int = None, resync: bool = False):
+        """Register a subscriber and return it with the events it missed
+
+        resync asks the client to reload instead, for ids parse_event_id rejected.
+        """
+        subscriber = Subscriber(store_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(store_id, set()).add(subscriber)
+            if resync or (last_event_id is not None and (
+                last_event_id < self._evicted.get(store_id, 0) or last_event_id > self._last_id
+            )):
+                # Missed events were evicted or were never in this buffer: the client must reload
+                return subscriber, [OrderEvent(self.epoch, self._last_id, store_id, "resync", {})]
+            if last_event_id is None:
+                return subscriber, []
+            history = self._history.get(store_id, ())
+            replay = [e for e in history if e.id > last_event_id]
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.store_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.store_id]
+        subscriber.closed = True
+
+order_events = OrderEventBroker()
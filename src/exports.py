@@ -0,0 +1,79 @@
+"""Streaming order history export as CSV or NDJSON"""
+import csv
+import io
+import orjson
+from src.database import SessionLocal
+from src.services import OrderService
+
+CSV_FIELDS = (
+    "order_id", "order_number", "created_at", "status", "table_number", "table_session_id",
+    "total_amount", "menu_id", "menu_name", "menu_price", "quantity", "subtotal"
+)
+ORDER_FIELDS = CSV_FIELDS[:7]
+ITEM_FIELDS = CSV_FIELDS[7:]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def csv_chunks(partitions):
+    """Header first, then one CSV block per fetched chunk of item rows"""
+    # BOM so spreadsheet apps read Korean menu names as UTF-8
+    yield ("\ufeff" + ",".join(CSV_FIELDS) + "\r\n").encode("utf-8")
+    for rows in partitions:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row.order_id, row.order_number, row.created_at.isoformat(), row.status.value,
+                row.table_number, row.table_session_id, row.total_amount, row.menu_id,
+                row.menu_name, row.menu_price, row.quantity, row.subtotal
+            ])
+        yield buffer.getvalue().encode("utf-8")
+
+def ndjson_chunks(partitions):
+    """One JSON object per order with its items; rows arrive grouped by order"""
+    order = None
+    for rows in partitions:
+        lines = []
+        for row in rows:
+            if order is None or order["order_id"] != row.order_id:
+                if order is not None:
+                    lines.append(orjson.dumps(order))
+                order = {field: getattr(row, field) for field in ORDER_FIELDS}
+                order["status"] = row.status.value
+                order["order_items"] = []
+            order["order_items"].append({field: getattr(row, field) for field in ITEM_FIELDS})
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    if order is not None:
+        yield orjson.dumps(order) + b"\n"
+
+ENCODERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+}
+
+def open_order_export(store_id: int, fmt: str, chunk_size: int = 1000, **filters):
+    """Validate filters and return a byte iterator that owns its DB session
+
+    The request's own session may be closed before the body finishes
+    streaming, so the export checks out a separate one and closes it
+    when the iterator is exhausted or abandoned.
+    """
+    db = SessionLocal()
+    try:
+        partitions = OrderService(db).export_orders(store_id, chunk_size=chunk_size, **filters)
+    except Exception:
+        db.close()
+        raise
+    return _closing(ENCODERS[fmt](partitions), partitions, db)
+
+def _closing(chunks, partitions, db):
+    try:
+        yield from chunks
+    finally:
+        # Release the server-side cursor even when the client disconnects early
+        partitions.close()
+        db.close()
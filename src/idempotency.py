@@ -0,0 +1,196 @@
+"""Idempotency keys for retried order submissions"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from src.config import config
+from src.models import IdempotencyKey
+
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+
+class IdempotencyConflictError(Exception):
+    """The key was already used for a different request body"""
+    pass
+
+class IdempotencyInFlightError(Exception):
+    """The original request is still running after the wait"""
+    pass
+
+def request_fingerprint(payload) -> str:
+    """Stable hash of a JSON-compatible request payload"""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class IdempotencyRecord:
+    __slots__ = ("fingerprint", "status", "status_code", "body")
+
+    def __init__(self, fingerprint: str, status: str, status_code: int = None, body: bytes = None):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.status_code = status_code
+        self.body = body
+
+class MemoryIdempotencyBackend:
+    """Per-process records; retries must reach the same worker"""
+    blocking = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def claim(self, key: str, fingerprint: str, lease_seconds: int):
+        """Record key as in flight; returns the existing record if there is a live one"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            if len(self._records) >= 1024:
+                self._records = {k: v for k, v in self._records.items() if v[1] > now}
+            self._records[key] = (IdempotencyRecord(fingerprint, IN_FLIGHT), now + lease_seconds)
+            return None
+
+    def complete(self, key: str, status_code: int, body: bytes, ttl_seconds: int):
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is not None:
+                record = IdempotencyRecord(entry[0].fingerprint, COMPLETED, status_code, body)
+                self._records[key] = (record, time.monotonic() + ttl_seconds)
+
+    def release(self, key: str):
+        with self._lock:
+            self._records.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+class DatabaseIdempotencyBackend:
+    """Records in idempotency_keys, shared by every worker
+
+    The primary key on the key column decides which request runs; an
+    expired row (finished past its TTL, or abandoned in flight by a
+    crashed worker) is deleted and claimed again.
+    """
+    blocking = True
+
+    def __init__(self, bind=None):
+        self._bind = bind
+        self._claims = 0
+
+    @property
+    def bind(self):
+        if self._bind is None:
+            from src.database import engine
+            self._bind = engine
+        return self._bind
+
+    def claim(self, key: str, fingerprint: str, lease_seconds: int):
+        now = datetime.utcnow()
+        self._claims += 1
+        if self._claims % 256 == 0:
+            self._purge(now)
+        for _ in range(3):
+            try:
+                with self.bind.begin() as conn:
+                    conn.execute(insert(IdempotencyKey).values(
+                        key=key, fingerprint=fingerprint, status=IN_FLIGHT,
+                        created_at=now, expires_at=now + timedelta(seconds=lease_seconds)
+                    ))
+                return None
+            except IntegrityError:
+                pass
+            with self.bind.connect() as conn:
+                row = conn.execute(
+                    select(
+                        IdempotencyKey.fingerprint, IdempotencyKey.status, IdempotencyKey.status_code,
+                        IdempotencyKey.response_body, IdempotencyKey.expires_at
+                    ).where(IdempotencyKey.key == key)
+                ).first()
+            if row is None:
+                continue
+            if row.expires_at <= now:
+                with self.bind.begin() as conn:
+                    conn.execute(delete(IdempotencyKey).where(
+                        IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+                    ))
+                continue
+            body = row.response_body.encode("utf-8") if row.response_body is not None else None
+            return IdempotencyRecord(row.fingerprint, row.status, row.status_code, body)
+        raise IdempotencyInFlightError("Could not claim idempotency key")
+
+    def _purge(self, now: datetime):
+        with self.bind.begin() as conn:
+            conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+
+    def complete(self, key: str, status_code: int, body: bytes, ttl_seconds: int):
+        with self.bind.begin() as conn:
+            conn.execute(
+                update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+                    status=COMPLETED, status_code=status_code, response_body=body.decode("utf-8"),
+                    expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+                )
+            )
+
+    def release(self, key: str):
+        with self.bind.begin() as conn:
+            conn.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+
+    def clear(self):
+        with self.bind.begin() as conn:
+            conn.execute(delete(IdempotencyKey))
+
+class IdempotencyStore:
+    """Claims keys, replays completed responses and waits on in-flight duplicates"""
+
+    def __init__(self, backend, ttl_seconds: int = None, lease_seconds: int = None,
+                 wait_seconds: float = None, poll_seconds: float = 0.05):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds or config.IDEMPOTENCY_TTL_SECONDS
+        self.lease_seconds = lease_seconds or config.IDEMPOTENCY_LEASE_SECONDS
+        self.wait_seconds = config.IDEMPOTENCY_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self.poll_seconds = poll_seconds
+
+    async def begin(self, key: str, fingerprint: str):
+        """Claim key for this request
+
+        Returns None when the caller should run the request, or the
+        completed record to replay.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = await self._call(self.backend.claim, key, fingerprint, self.lease_seconds)
+            if record is None:
+                return None
+            if record.fingerprint != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was used with a different request")
+            if record.status == COMPLETED:
+                return record
+            if time.monotonic() >= deadline:
+                raise IdempotencyInFlightError("A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def complete(self, key: str, status_code: int, body: bytes):
+        await self._call(self.backend.complete, key, status_code, body, self.ttl_seconds)
+
+    async def release(self, key: str):
+        """Forget a claim whose request failed so a retry runs again"""
+        await self._call(self.backend.release, key)
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+def create_idempotency_store() -> IdempotencyStore:
+    if config.IDEMPOTENCY_BACKEND == "database":
+        return IdempotencyStore(DatabaseIdempotencyBackend())
+    return IdempotencyStore(MemoryIdempotencyBackend())
+
+idempotency_store = create_idempotency_store()
@@ -0,0 +1,259 @@
+"""Resized WebP variants of menu images in a content-addressed disk cache"""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+from src.config import config
+from src import metrics
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; menus are then served without variants
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+URL_PREFIX = "/api/images"
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+def image_key(image_url: str) -> str:
+    """Object key of a menu image_url: the path of a bucket URL, or the value as given"""
+    return unquote(urlparse(image_url).path).lstrip("/")
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)
+
+def _read(path: str):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+class LocalImageStorage:
+    """Original images in a directory, addressed by S3-style object keys
+
+    Stands in for the S3 bucket in development and single-host setups;
+    another backend only needs get(key) and put(key, data).
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def get(self, key: str):
+        path = self._path(key)
+        return _read(path) if path else None
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        if path is None:
+            raise ValueError(f"Invalid image key: {key!r}")
+        _write_atomic(path, data)
+
+    def _path(self, key: str):
+        path = os.path.abspath(os.path.join(self.root, key))
+        # Keys come from admin-entered URLs; never read outside the root
+        return path if path.startswith(self.root + os.sep) else None
+
+STORAGE_BACKENDS = {
+    "local": lambda: LocalImageStorage(config.IMAGE_STORAGE_DIR),
+}
+
+class VariantCache:
+    """Encoded variants on disk, named by the digest of their original
+
+    Files are never rewritten with different content, so they can be
+    served as immutable. Past max_bytes the least recently read files
+    are deleted. Each worker tracks usage of the shared directory on
+    its own, so the limit is approximate with several workers.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # path -> size, least recently used first; loaded from disk on first use
+        self._files = None
+        self._total = 0
+
+    def path(self, digest: str, width: int) -> str:
+        return os.path.join(self.root, "variants", digest[:2], f"{digest}-{width}.webp")
+
+    def get(self, digest: str, width: int):
+        path = self.path(digest, width)
+        data = _read(path)
+        with self._lock:
+            files = self._index()
+            if data is None:
+                self._total -= files.pop(path, 0)
+                return None
+            if path in files:
+                files.move_to_end(path)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, digest: str, width: int, data: bytes):
+        path = self.path(digest, width)
+        _write_atomic(path, data)
+        with self._lock:
+            files = self._index()
+            self._total += len(data) - files.pop(path, 0)
+            files[path] = len(data)
+            self._evict(keep=path)
+
+    def _index(self) -> OrderedDict:
+        if self._files is None:
+            found = []
+            for folder, _, names in os.walk(os.path.join(self.root, "variants")):
+                for name in names:
+                    if not name.endswith(".webp"):
+                        continue
+                    path = os.path.join(folder, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:  # evicted by another worker meanwhile
+                        continue
+                    found.append((stat.st_mtime, path, stat.st_size))
+            self._files = OrderedDict((path, size) for _, path, size in sorted(found))
+            self._total = sum(self._files.values())
+        return self._files
+
+    def _evict(self, keep: str):
+        while self._total > self.max_bytes and len(self._files) > 1:
+            path, size = next(iter(self._files.items()))
+            if path == keep:
+                self._files.move_to_end(path)
+                continue
+            del self._files[path]
+            self._total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class MenuImages:
+    """Renders, caches and resolves the WebP variants of menu images
+
+    Variants are rendered when a menu is saved with an image, and the
+    digest of the original is stored on the menu. Menu payloads build
+    variant URLs from that digest alone; a variant evicted from the
+    cache is rendered again on its next request. A replaced image gets
+    new URLs while the old ones stay valid until evicted.
+    """
+
+    def __init__(self, storage, cache: VariantCache, widths=None, quality: int = None):
+        self.storage = storage
+        self.cache = cache
+        self.widths = tuple(sorted(widths or config.IMAGE_VARIANT_WIDTHS))
+        self.quality = quality or config.IMAGE_WEBP_QUALITY
+        self._lock = threading.Lock()
+        # digest -> object key, mirrored on disk for other workers and restarts
+        self._keys = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and bool(self.widths)
+
+    def variant_urls(self, digest: str):
+        """Variant URLs by width ("160": url) for a stored digest, or None"""
+        if not digest or not self.enabled:
+            return None
+        return {str(width): f"{URL_PREFIX}/{digest}/{width}.webp" for width in self.widths}
+
+    def prepare(self, image_url: str):
+        """Read the original, render any missing variants and return its digest"""
+        if not image_url or not self.enabled:
+            return None
+        key = image_key(image_url)
+        original = self.storage.get(key)
+        if original is None:
+            logger.warning(f"Menu image not found in storage: {key}")
+            return None
+        digest = hashlib.sha256(original).hexdigest()[:32]
+        missing = [width for width in self.widths if not os.path.exists(self.cache.path(digest, width))]
+        if missing and not self._render(digest, original, missing):
+            return None
+        self._remember(key, digest)
+        return digest
+
+    def get_variant(self, digest: str, width: int):
+        """Encoded variant bytes, re-rendered from the original if they were evicted"""
+        if width not in self.widths or not DIGEST_PATTERN.match(digest):
+            return None
+        data = self.cache.get(digest, width)
+        if data is not None or not self.enabled:
+            return data
+
+        key = self._key_of(digest)
+        original = self.storage.get(key) if key else None
+        # The original may have been replaced since; its digest then names other files
+        if original is None or hashlib.sha256(original).hexdigest()[:32] != digest:
+            return None
+        return self._render(digest, original, [width]).get(width)
+
+    def _render(self, digest: str, original: bytes, widths) -> dict:
+        try:
+            with Image.open(io.BytesIO(original)) as opened:
+                # Phone photos carry their rotation in EXIF
+                image = ImageOps.exif_transpose(opened)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+                rendered = {}
+                for width in widths:
+                    variant = image
+                    if image.width > width:
+                        # Never upscale; narrower originals are only re-encoded
+                        variant = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    variant.save(buffer, "WEBP", quality=self.quality, method=4)
+                    rendered[width] = buffer.getvalue()
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning(f"Cannot render menu image {digest}: {e}")
+            return {}
+        for width, data in rendered.items():
+            self.cache.put(digest, width, data)
+        metrics.image_variants_rendered.inc(amount=len(rendered))
+        return rendered
+
+    def _remember(self, key: str, digest: str):
+        with self._lock:
+            if self._keys.get(digest) == key:
+                return
+            self._keys[digest] = key
+        _write_atomic(self._manifest_path("origins", digest), key.encode("utf-8"))
+
+    def _key_of(self, digest: str):
+        with self._lock:
+            key = self._keys.get(digest)
+        if key is None:
+            data = _read(self._manifest_path("origins", digest))
+            key = data.decode("utf-8") if data else None
+            if key:
+                with self._lock:
+                    self._keys[digest] = key
+        return key
+
+    def _manifest_path(self, kind: str, name: str) -> str:
+        return os.path.join(self.cache.root, kind, name[:2], name)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+def create_menu_images() -> MenuImages:
+    storage = STORAGE_BACKENDS[config.IMAGE_STORAGE_BACKEND]()
+    cache = VariantCache(config.IMAGE_CACHE_DIR, config.IMAGE_CACHE_MAX_MB * 1024 * 1024)
+    return MenuImages(storage, cache)
+
+menu_images = create_menu_images()
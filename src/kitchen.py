@@ -0,0 +1,119 @@
+"""In-memory board of quantities the kitchen still has to prepare"""
+import threading
+from src.models import Order, OrderItem, OrderStatus
+
+OUTSTANDING = (OrderStatus.PENDING, OrderStatus.PREPARING)
+
+class KitchenBoard:
+    """Pending and preparing quantities per store and menu
+
+    OrderService keeps it current as orders are created and move through
+    their statuses, so reading a store's board costs nothing in SQL.
+    Each worker holds its own board; orders handled by another worker
+    show up at the next rebuild from the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Only one rebuild at a time records the changes made while it reads
+        self._rebuild_lock = threading.Lock()
+        # order_id -> (store_id, status, ((menu_id, menu_name, quantity), ...))
+        self._orders = {}
+        # store_id -> {menu_id: {"menu_name", "pending", "preparing"}}
+        self._totals = {}
+        # Changes made while a rebuild reads the database, replayed onto its snapshot
+        self._changes = None
+
+    def order_created(self, store_id: int, order_id: int, items):
+        """items: (menu_id, menu_name, quantity) tuples of a new pending order"""
+        items = tuple(items)
+        with self._lock:
+            self._order_created(store_id, order_id, items)
+            if self._changes is not None:
+                self._changes.append((self._order_created, (store_id, order_id, items)))
+
+    def status_changed(self, order_id: int, status: OrderStatus):
+        """Move an order's items between columns; completed orders leave the board"""
+        with self._lock:
+            self._status_changed(order_id, status)
+            if self._changes is not None:
+                self._changes.append((self._status_changed, (order_id, status)))
+
+    def outstanding(self, store_id: int) -> list:
+        with self._lock:
+            totals = self._totals.get(store_id, {})
+            return [
+                {"menu_id": menu_id, **counts, "total": counts["pending"] + counts["preparing"]}
+                for menu_id, counts in sorted(totals.items())
+            ]
+
+    def rebuild(self, db):
+        """Replace the board with the outstanding orders in the database
+
+        Orders created or moved by this worker while the query runs are
+        replayed onto its result, so none is dropped or left behind.
+        """
+        with self._rebuild_lock:
+            with self._lock:
+                self._changes = []
+            try:
+                rows = db.query(
+                    Order.id, Order.store_id, Order.status,
+                    OrderItem.menu_id, OrderItem.menu_name, OrderItem.quantity
+                ).join(OrderItem, OrderItem.order_id == Order.id).filter(
+                    Order.status.in_(OUTSTANDING)
+                ).all()
+            except BaseException:
+                with self._lock:
+                    self._changes = None
+                raise
+
+            orders = {}
+            for row in rows:
+                entry = orders.setdefault(row.id, (row.store_id, row.status, []))
+                entry[2].append((row.menu_id, row.menu_name, row.quantity))
+            with self._lock:
+                self._orders = {}
+                self._totals = {}
+                for order_id, (store_id, status, items) in orders.items():
+                    self._orders[order_id] = (store_id, status, tuple(items))
+                    self._apply(store_id, items, status, 1)
+                changes, self._changes = self._changes, None
+                for change, args in changes:
+                    change(*args)
+                return len(self._orders)
+
+    def clear(self):
+        with self._lock:
+            self._orders.clear()
+            self._totals.clear()
+
+    def _order_created(self, store_id: int, order_id: int, items):
+        if order_id not in self._orders:
+            self._orders[order_id] = (store_id, OrderStatus.PENDING, items)
+            self._apply(store_id, items, OrderStatus.PENDING, 1)
+
+    def _status_changed(self, order_id: int, status: OrderStatus):
+        entry = self._orders.get(order_id)
+        if entry is None or entry[1] == status:
+            return
+        store_id, previous, items = entry
+        self._apply(store_id, items, previous, -1)
+        if status in OUTSTANDING:
+            self._orders[order_id] = (store_id, status, items)
+            self._apply(store_id, items, status, 1)
+        else:
+            del self._orders[order_id]
+
+    def _apply(self, store_id: int, items, status: OrderStatus, sign: int):
+        totals = self._totals.setdefault(store_id, {})
+        column = status.value
+        for menu_id, menu_name, quantity in items:
+            counts = totals.get(menu_id)
+            if counts is None:
+                counts = totals[menu_id] = {"menu_name": menu_name, "pending": 0, "preparing": 0}
+            counts[column] += sign * quantity
+            if not counts["pending"] and not counts["preparing"]:
+                del totals[menu_id]
+
+kitchen_board = KitchenBoard()
@@ -1,25 +1,37 @@
 """FastAPI main application with all endpoints"""
-from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from sse_starlette.sse import EventSourceResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
+from datetime import date, datetime
 import time
 import logging
 
-from src.database import get_db, Base, engine
+from src.database import get_db, get_request_db, run_db, track_queries, pool_stats, dispose_engines
 from src.services import (
-    AuthService, MenuService, OrderService, SessionService,
+    AuthService, MenuService,
+    AsyncAuthService, AsyncMenuService, AsyncOrderService, AsyncSessionService, AsyncReportService,
     AuthenticationError, AccountLockedError, InvalidTokenError,
     SessionExpiredError, ValidationError, InvalidStatusTransitionError
 )
-from src.models import OrderStatus
+from src.models import OrderStatus, Store
 from src.config import config
-from src.utils import verify_jwt_token
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from src.utils import verify_jwt_token, password_pool, PasswordPoolBusyError
+from src.events import order_events
+from src.exports import open_order_export, MEDIA_TYPES
+from src import metrics
+from src.sweeper import session_sweeper, kitchen_resync
+from src.kitchen import kitchen_board
+from src.images import menu_images
+from src.throttle import login_throttle, client_address, LoginThrottledError
+from src.idempotency import (
+    idempotency_store, request_fingerprint,
+    IdempotencyConflictError, IdempotencyInFlightError
+)
 
 # Setup logging
 logging.basicConfig(
@@ -28,7 +40,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="TableOrder API", version="1.0.0")
+app = FastAPI(title="TableOrder API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 origins = ["*"] if config.ENVIRONMENT == "development" else [config.FRONTEND_URL]
@@ -43,12 +55,32 @@ app.add_middleware(
 # Timing middleware
 @app.middleware("http")
 async def timing_middleware(request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    """Record latency per route template; unmatched paths share one label"""
+    start_time = time.perf_counter()
+    metrics.http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        with track_queries() as queries:
+            response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        process_time = time.perf_counter() - start_time
+        metrics.http_requests_in_flight.dec()
+        route = request.scope.get("route")
+        route_path = route.path if route else "unmatched"
+        metrics.http_request_duration.observe(process_time, request.method, route_path)
+        metrics.http_requests.inc(request.method, route_path, str(status_code))
+        if status_code >= 500:
+            metrics.http_request_errors.inc(request.method, route_path)
+    
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-DB-Query-Count"] = str(queries.count)
+    response.headers["X-DB-Time"] = f"{queries.duration:.6f}"
     
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
+    for statement, count in queries.repeated(config.QUERY_REPEAT_WARN_THRESHOLD):
+        logger.warning(
+            f"Possible N+1: {request.method} {route_path} ran {count}x: {' '.join(statement.split())[:200]}"
+        )
     
     if process_time > 0.5:
         logger.warning(f"Slow API: {request.method} {request.url.path} took {process_time:.3f}s")
@@ -81,6 +113,21 @@ class UpdateMenuRequest(BaseModel):
     image_url: Optional[str] = None
     is_available: Optional[bool] = None
 
+class MenuBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete", "reorder"]
+    menu_id: Optional[int] = None
+    category_id: Optional[int] = None
+    name: Optional[str] = None
+    price: Optional[int] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    display_order: Optional[int] = None
+    is_available: Optional[bool] = None
+
+class MenuBatchRequest(BaseModel):
+    store_id: int
+    operations: List[MenuBatchOperation] = Field(..., min_length=1, max_length=500)
+
 class OrderItemRequest(BaseModel):
     menu_id: int
     quantity: int
@@ -91,8 +138,104 @@ class CreateOrderRequest(BaseModel):
 class UpdateOrderStatusRequest(BaseModel):
     status: str
 
+class BulkOrderStatusRequest(BaseModel):
+    store_id: int
+    order_ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: str
+
+# Response models
+class MenuResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    store_id: int
+    category_id: int
+    name: str
+    description: Optional[str] = None
+    price: int
+    image_url: Optional[str] = None
+    display_order: Optional[int] = None
+    is_available: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class OrderItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    order_id: int
+    menu_id: int
+    menu_name: str
+    menu_price: int
+    quantity: int
+    subtotal: int
+    created_at: Optional[datetime] = None
+
+class OrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    store_id: int
+    table_session_id: int
+    order_number: str
+    total_amount: int
+    status: OrderStatus
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class OrderDetailResponse(OrderResponse):
+    order_items: List[OrderItemResponse] = []
+
+class SessionSummaryResponse(BaseModel):
+    session_id: int
+    table_number: Optional[str] = None
+    is_active: bool
+    order_count: int
+    total_amount: int
+    item_count: int
+    last_order_at: Optional[datetime] = None
+
+class TableOverviewResponse(BaseModel):
+    table_id: int
+    table_number: str
+    active_sessions: int
+    order_count: int
+    total_amount: int
+    item_count: int
+    last_order_at: Optional[datetime] = None
+
+class SalesReportRow(BaseModel):
+    sales_date: date
+    hour: Optional[int] = None
+    menu_id: Optional[int] = None
+    menu_name: Optional[str] = None
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    quantity: int
+    revenue: int
+    order_count: Optional[int] = None  # menu rows only
+
+class KitchenItemResponse(BaseModel):
+    menu_id: int
+    menu_name: str
+    pending: int
+    preparing: int
+    total: int
+
+class OrderStatusConflict(BaseModel):
+    order_id: int
+    current_status: Optional[OrderStatus] = None
+
+class BulkOrderStatusResponse(BaseModel):
+    updated: List[OrderResponse]
+    conflicts: List[OrderStatusConflict]
+
+class OrderPageResponse(BaseModel):
+    orders: List[OrderDetailResponse]
+    next_cursor: Optional[str] = None
+
 # Auth dependency
-def verify_admin_token(authorization: str = Header(None), db: Session = Depends(get_db)):
+def verify_admin_token(authorization: str = Header(None)):
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
@@ -104,50 +247,80 @@ def verify_admin_token(authorization: str = Header(None), db: Session = Depends(
     
     return payload
 
-def verify_session(authorization: str = Header(None), db: Session = Depends(get_db)):
+async def verify_session(authorization: str = Header(None), db = Depends(get_request_db)):
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
     token = authorization.replace("Bearer ", "")
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
     
     try:
-        session = auth_service.verify_session_token(token)
+        session = await auth_service.verify_session_token(token)
         return session
     except (InvalidTokenError, SessionExpiredError) as e:
         raise HTTPException(status_code=401, detail=str(e))
 
+_default_store_id = None
+
+def get_default_store_id(db: Session) -> int:
+    """Resolve the first store once; used when clients omit store_id"""
+    global _default_store_id
+    if _default_store_id is None:
+        first_store = db.query(Store.id).order_by(Store.id).first()
+        if not first_store:
+            raise HTTPException(status_code=404, detail="No store found")
+        _default_store_id = first_store.id
+    return _default_store_id
+
 # Health check
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "ok", "timestamp": datetime.utcnow().isoformat(), "db_pool": pool_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus text exposition of the in-process registry"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 # Auth endpoints
+def login_client(http_request: Request) -> str:
+    """Client address for throttling; X-Forwarded-For counts only from TRUSTED_PROXIES"""
+    peer = http_request.client.host if http_request.client else ""
+    return client_address(peer, http_request.headers.get("x-forwarded-for"))
+
+def check_login_throttle(http_request: Request, kind: str, *account):
+    try:
+        login_throttle.check(login_client(http_request), (kind, *account))
+    except LoginThrottledError as e:
+        metrics.logins_failed.inc(kind, "throttled")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 @app.post("/api/auth/admin-login")
-def admin_login(request: AdminLoginRequest, db: Session = Depends(get_db)):
+def admin_login(request: AdminLoginRequest, http_request: Request, db: Session = Depends(get_db)):
+    check_login_throttle(http_request, "admin", request.store_id, request.username)
     try:
         auth_service = AuthService(db)
         token = auth_service.login_admin(request.store_id, request.username, request.password)
+        login_throttle.succeeded(login_client(http_request), ("admin", request.store_id, request.username))
         return {"token": token, "expires_in": config.JWT_EXPIRE_HOURS * 3600}
     except AuthenticationError as e:
         raise HTTPException(status_code=401, detail=str(e))
     except AccountLockedError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 @app.post("/api/auth/table-login")
-def table_login(request: TableLoginRequest, db: Session = Depends(get_db)):
+def table_login(request: TableLoginRequest, http_request: Request, db: Session = Depends(get_db)):
+    # If store_id not provided, use the first store
+    store_id = request.store_id
+    if store_id is None:
+        store_id = get_default_store_id(db)
+    check_login_throttle(http_request, "table", store_id, request.table_number)
     try:
         auth_service = AuthService(db)
-        # If store_id not provided, use the first store
-        store_id = request.store_id
-        if store_id is None:
-            from src.models import Store
-            first_store = db.query(Store).first()
-            if not first_store:
-                raise HTTPException(status_code=404, detail="No store found")
-            store_id = first_store.id
-        
         token = auth_service.login_table(store_id, request.table_number, request.password)
+        login_throttle.succeeded(login_client(http_request), ("table", store_id, request.table_number))
         return {
             "session_token": token, 
             "expires_in": config.SESSION_EXPIRE_HOURS * 3600,
@@ -158,51 +331,41 @@ def table_login(request: TableLoginRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail=str(e))
     except AccountLockedError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 # Menu endpoints
 @app.get("/api/menus")
-def get_menus(store_id: int = None, db: Session = Depends(get_db)):
+async def get_menus(
+    store_id: int = None,
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_request_db)
+):
     # If store_id not provided, use the first store
     if store_id is None:
-        from src.models import Store
-        first_store = db.query(Store).first()
-        if not first_store:
-            raise HTTPException(status_code=404, detail="No store found")
-        store_id = first_store.id
-    
-    menu_service = MenuService(db)
-    result = menu_service.get_menus_by_store(store_id)
+        store_id = _default_store_id or await run_db(db, get_default_store_id)
     
-    # Convert SQLAlchemy objects to dictionaries
-    menus_data = []
-    for menu in result["menus"]:
-        menus_data.append({
-            "id": menu.id,
-            "storeId": menu.store_id,
-            "categoryId": menu.category_id,
-            "name": menu.name,
-            "description": menu.description,
-            "price": menu.price,
-            "imageUrl": menu.image_url,
-            "displayOrder": menu.display_order,
-            "isAvailable": menu.is_available
-        })
+    menu_service = AsyncMenuService(db)
+    snapshot = await menu_service.get_menu_snapshot(store_id)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
     
-    categories_data = []
-    for category in result["categories"]:
-        categories_data.append({
-            "id": category.id,
-            "storeId": category.store_id,
-            "name": category.name,
-            "displayOrder": category.display_order
-        })
+    if if_none_match and snapshot.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
     
-    return {
-        "menus": menus_data,
-        "categories": categories_data
-    }
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@app.get("/api/images/{digest}/{width}.webp")
+def get_menu_image(digest: str, width: int):
+    # The URL names the original's content, so the response never changes
+    data = menu_images.get_variant(digest, width)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return Response(content=data, media_type="image/webp", headers={
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}-{width}"'
+    })
 
-@app.post("/api/admin/menus")
+@app.post("/api/admin/menus", response_model=MenuResponse)
 def create_menu(
     request: CreateMenuRequest,
     admin: dict = Depends(verify_admin_token),
@@ -218,7 +381,20 @@ def create_menu(
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.put("/api/admin/menus/{menu_id}")
+@app.post("/api/admin/menus/batch")
+def apply_menu_batch(
+    request: MenuBatchRequest,
+    admin: dict = Depends(verify_admin_token),
+    db: Session = Depends(get_db)
+):
+    try:
+        menu_service = MenuService(db)
+        operations = [op.model_dump(exclude_unset=True) for op in request.operations]
+        return menu_service.apply_menu_batch(request.store_id, operations)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/api/admin/menus/{menu_id}", response_model=MenuResponse)
 def update_menu(
     menu_id: int,
     request: UpdateMenuRequest,
@@ -243,63 +419,245 @@ def delete_menu(
     return {"message": "Menu deleted"}
 
 # Order endpoints
-@app.post("/api/orders")
-def create_order(
+@app.post("/api/orders", response_model=OrderDetailResponse)
+async def create_order(
     request: CreateOrderRequest,
     session = Depends(verify_session),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None),
+    db = Depends(get_request_db)
 ):
+    items = [item.dict() for item in request.items]
+    if not idempotency_key:
+        return await _create_order(db, session, items)
+    
+    if len(idempotency_key) > 200:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+    
+    # Keys are scoped to the table session that sent them
+    key = f"{session.id}:{idempotency_key}"
     try:
-        order_service = OrderService(db)
-        items = [item.dict() for item in request.items]
-        order = order_service.create_order(session.session_token, items)
-        return order
+        record = await idempotency_store.begin(key, request_fingerprint(items))
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInFlightError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    
+    if record is not None:
+        return Response(
+            content=record.body, status_code=record.status_code,
+            media_type="application/json", headers={"Idempotent-Replayed": "true"}
+        )
+    
+    try:
+        response = await _create_order(db, session, items)
+    except HTTPException:
+        # Rejected before anything was written: the client may retry right away
+        await idempotency_store.release(key)
+        raise
+    # On cancellation or any other error the order may still commit in its
+    # worker thread, so the key stays leased until IDEMPOTENCY_LEASE_SECONDS
+    await idempotency_store.complete(key, response.status_code, response.body)
+    return response
+
+async def _create_order(db, session, items: list) -> Response:
+    try:
+        order_service = AsyncOrderService(db)
+        order = await order_service.create_order(session.session_token, items, session=session)
     except (ValidationError, SessionExpiredError) as e:
         raise HTTPException(status_code=400, detail=str(e))
+    body = OrderDetailResponse.model_validate(order).model_dump_json().encode("utf-8")
+    return Response(content=body, media_type="application/json")
 
-@app.get("/api/orders")
-def get_orders(
+@app.get("/api/orders", response_model=List[OrderDetailResponse])
+async def get_orders(
     session = Depends(verify_session),
-    db: Session = Depends(get_db)
+    db = Depends(get_request_db)
 ):
-    order_service = OrderService(db)
-    orders = order_service.get_orders_by_session(session.session_token)
+    order_service = AsyncOrderService(db)
+    orders = await order_service.get_orders_by_session(session.session_token, session=session)
     return orders
 
-@app.get("/api/admin/orders")
-def get_all_orders(
+@app.get("/api/orders/summary", response_model=SessionSummaryResponse)
+async def get_order_summary(
+    session = Depends(verify_session),
+    db = Depends(get_request_db)
+):
+    session_service = AsyncSessionService(db)
+    summary = await session_service.get_session_summary(session.id)
+    return {**summary, "table_number": session.table_number}
+
+@app.get("/api/admin/tables", response_model=List[TableOverviewResponse])
+async def get_table_overview(
     store_id: int,
     admin: dict = Depends(verify_admin_token),
-    db: Session = Depends(get_db)
+    db = Depends(get_request_db)
 ):
-    from src.models import Order
-    orders = db.query(Order).filter(Order.store_id == store_id).order_by(Order.created_at.desc()).all()
-    return orders
+    session_service = AsyncSessionService(db)
+    return await session_service.get_table_overview(store_id)
+
+@app.get("/api/admin/orders", response_model=OrderPageResponse)
+async def get_all_orders(
+    store_id: int,
+    status: Optional[str] = None,
+    table_number: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    admin: dict = Depends(verify_admin_token),
+    db = Depends(get_request_db)
+):
+    try:
+        order_service = AsyncOrderService(db)
+        return await order_service.get_orders_by_store(
+            store_id, status=status, table_number=table_number,
+            created_from=created_from, created_to=created_to,
+            cursor=cursor, limit=limit
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/admin/orders/export")
+def export_orders(
+    store_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Optional[str] = None,
+    table_number: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    admin: dict = Depends(verify_admin_token)
+):
+    """Stream order history with items, oldest first, without buffering it"""
+    try:
+        chunks = open_order_export(
+            store_id, format, status=status, table_number=table_number,
+            created_from=created_from, created_to=created_to
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers={
+        "Content-Disposition": f'attachment; filename="orders-{store_id}.{format}"'
+    })
+
+@app.get("/api/admin/kitchen", response_model=List[KitchenItemResponse])
+async def get_kitchen_board(
+    store_id: int,
+    admin: dict = Depends(verify_admin_token)
+):
+    """Quantities still pending or preparing per menu, served from memory"""
+    return kitchen_board.outstanding(store_id)
+
+@app.get("/api/admin/orders/stream")
+async def stream_orders(
+    store_id: int,
+    last_event_id: Optional[str] = Header(None),
+    admin: dict = Depends(verify_admin_token)
+):
+    """Push order-created / order-updated / session-closed events as SSE"""
+    # Ids from before a restart or from another worker do not parse: resync
+    resume_from = order_events.parse_event_id(last_event_id) if last_event_id else None
+    subscriber, replay = order_events.subscribe(
+        store_id, resume_from, resync=bool(last_event_id) and resume_from is None
+    )
+    
+    async def event_stream():
+        try:
+            for event in replay:
+                yield event.to_sse()
+            async for event in subscriber:
+                yield event.to_sse()
+        finally:
+            order_events.unsubscribe(subscriber)
+    
+    return EventSourceResponse(event_stream(), ping=config.SSE_HEARTBEAT_SECONDS)
 
-@app.put("/api/admin/orders/{order_id}/status")
-def update_order_status(
+@app.put("/api/admin/orders/{order_id}/status", response_model=OrderResponse)
+async def update_order_status(
     order_id: int,
     request: UpdateOrderStatusRequest,
     admin: dict = Depends(verify_admin_token),
-    db: Session = Depends(get_db)
+    db = Depends(get_request_db)
 ):
     try:
-        order_service = OrderService(db)
-        order = order_service.update_order_status(order_id, request.status)
+        order_service = AsyncOrderService(db)
+        order = await order_service.update_order_status(order_id, request.status)
         return order
     except (ValidationError, InvalidStatusTransitionError) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/api/admin/reports/sales", response_model=List[SalesReportRow])
+async def get_sales_report(
+    store_id: int,
+    date_from: date,
+    date_to: date,
+    group_by: Literal["menu", "category"] = "menu",
+    granularity: Literal["day", "hour"] = "day",
+    admin: dict = Depends(verify_admin_token),
+    db = Depends(get_request_db)
+):
+    """Completed sales from the sales_hourly rollup (UTC days)"""
+    report_service = AsyncReportService(db)
+    return await report_service.get_sales(
+        store_id, date_from, date_to, group_by=group_by, granularity=granularity
+    )
+
+@app.put("/api/admin/orders/status", response_model=BulkOrderStatusResponse)
+async def update_order_statuses(
+    request: BulkOrderStatusRequest,
+    admin: dict = Depends(verify_admin_token),
+    db = Depends(get_request_db)
+):
+    """Move many orders with one conditional UPDATE; orders in another status come back as conflicts"""
+    try:
+        order_service = AsyncOrderService(db)
+        return await order_service.update_order_statuses(
+            request.order_ids, request.status, store_id=request.store_id
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/admin/sessions/{session_id}/close")
-def close_session(
+async def close_session(
     session_id: int,
     admin: dict = Depends(verify_admin_token),
-    db: Session = Depends(get_db)
+    db = Depends(get_request_db)
 ):
-    session_service = SessionService(db)
-    session_service.close_session(session_id)
+    session_service = AsyncSessionService(db)
+    await session_service.close_session(session_id)
     return {"message": "Session closed"}
 
+@app.post("/api/admin/stores/{store_id}/sessions/close")
+async def close_store_sessions(
+    store_id: int,
+    admin: dict = Depends(verify_admin_token),
+    db = Depends(get_request_db)
+):
+    session_service = AsyncSessionService(db)
+    closed = await session_service.close_store_sessions(store_id)
+    return {"message": "Sessions closed", "closed": closed}
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    session_sweeper.start()
+
+@app.on_event("startup")
+async def load_kitchen_board():
+    await run_in_threadpool(kitchen_resync.run_once)
+    kitchen_resync.start()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await session_sweeper.stop()
+    await kitchen_resync.stop()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    await dispose_engines()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,164 @@
+"""In-process metrics registry rendered in Prometheus text format"""
+import threading
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+class Gauge(Metric):
+    """Gauge that is either set directly or read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, *args, callback=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._callback = callback
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def render(self) -> list:
+        if self._callback:
+            return [f"{self.name} {_format_value(self._callback())}"]
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # Per-bucket counts (the last slot is +Inf), sum
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list:
+        with self._lock:
+            snapshot = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+        lines = []
+        for labelvalues, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, labelvalues, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# HTTP
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route")
+)
+http_requests = Counter(
+    "http_requests_total", "Requests by route template and status",
+    ("method", "route", "status")
+)
+http_request_errors = Counter(
+    "http_request_errors_total", "Requests that failed with a 5xx or an unhandled exception",
+    ("method", "route")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled"
+)
+
+# Database
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+# Business
+orders_created = Counter("orders_created_total", "Orders created")
+order_status_changes = Counter(
+    "order_status_changes_total", "Order status transitions", ("status",)
+)
+sessions_expired = Counter("sessions_expired_total", "Sessions deactivated by the expiry sweeper")
+logins_failed = Counter(
+    "logins_failed_total", "Failed login attempts", ("kind", "reason")
+)
+image_variants_rendered = Counter("image_variants_rendered_total", "Menu image variants encoded")
@@ -1,6 +1,6 @@
 """Database models - All entities in one file"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from src.database import Base
 import enum
@@ -27,6 +27,8 @@ class Store(Base):
 class AdminUser(Base):
     __tablename__ = "admin_users"
     __table_args__ = (
+        # Backs admin login by store and username
+        Index("ix_admin_users_store_username", "store_id", "username", unique=True),
         {'sqlite_autoincrement': True},
     )
     
@@ -43,6 +45,10 @@ class AdminUser(Base):
 
 class TableAuth(Base):
     __tablename__ = "table_auths"
+    __table_args__ = (
+        # Backs table login and the per-store table overview
+        Index("ix_table_auths_store_table", "store_id", "table_number", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
@@ -58,21 +64,36 @@ class TableAuth(Base):
 
 class TableSession(Base):
     __tablename__ = "table_sessions"
+    __table_args__ = (
+        # Backs the expiry sweep: active sessions past expired_at
+        Index("ix_table_sessions_active_expired", "is_active", "expired_at"),
+        # Backs the per-table overview of active sessions
+        Index("ix_table_sessions_table_active", "table_auth_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     table_auth_id = Column(Integer, ForeignKey("table_auths.id"), nullable=False)
     session_token = Column(String(255), unique=True, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_order_at = Column(DateTime, nullable=True)
+    # When the session stops being valid; kept in step with created_at / last_order_at
     expired_at = Column(DateTime, nullable=True)
     closed_at = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Running totals maintained by OrderService.create_order
+    order_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_amount = Column(Integer, nullable=False, default=0, server_default="0")
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     table_auth = relationship("TableAuth", back_populates="sessions")
     orders = relationship("Order", back_populates="table_session")
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Backs the customer menu's category list in display order
+        Index("ix_categories_store_order", "store_id", "display_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
@@ -86,6 +107,10 @@ class Category(Base):
 
 class Menu(Base):
     __tablename__ = "menus"
+    __table_args__ = (
+        # Backs the customer menu: available items of a store in display order
+        Index("ix_menus_store_available_category_order", "store_id", "is_available", "category_id", "display_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
@@ -94,6 +119,8 @@ class Menu(Base):
     description = Column(Text, nullable=True)
     price = Column(Integer, nullable=False)
     image_url = Column(String(500), nullable=True)
+    # Content digest of the image, set when image_url is saved; names its variants
+    image_digest = Column(String(32), nullable=True)
     display_order = Column(Integer, default=0)
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -105,11 +132,19 @@ class Menu(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Backs keyset pagination of the admin order list
+        Index("ix_orders_store_created_id", "store_id", "created_at", "id"),
+        # Backs a table session's order history
+        Index("ix_orders_session_created", "table_session_id", "created_at"),
+        # Backs the kitchen board rebuild: the few orders not yet completed
+        Index("ix_orders_status", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
     table_session_id = Column(Integer, ForeignKey("table_sessions.id"), nullable=False)
-    order_number = Column(String(20), unique=True, nullable=False, index=True)
+    order_number = Column(String(32), unique=True, nullable=False, index=True)
     total_amount = Column(Integer, nullable=False)
     status = Column(SQLEnum(OrderStatus), default=OrderStatus.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -119,11 +154,49 @@ class Order(Base):
     table_session = relationship("TableSession", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+class OrderSequence(Base):
+    __tablename__ = "order_sequences"
+    
+    store_id = Column(Integer, ForeignKey("stores.id"), primary_key=True)
+    business_date = Column(String(8), primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
+
+class SalesRollup(Base):
+    """Completed sales per store, UTC day, hour and menu
+
+    Maintained by OrderService.update_order_status and rebuilt by
+    backfill_sales.py; menu_id carries no foreign key so rows outlive
+    deleted menus.
+    """
+    __tablename__ = "sales_hourly"
+    
+    store_id = Column(Integer, ForeignKey("stores.id"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    menu_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, nullable=True)
+    menu_name = Column(String(100), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+    # Orders that included the menu
+    order_count = Column(Integer, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
     menu_name = Column(String(100), nullable=False)
     menu_price = Column(Integer, nullable=False)
@@ -133,3 +206,32 @@ class OrderItem(Base):
     
     order = relationship("Order", back_populates="order_items")
     menu = relationship("Menu", back_populates="order_items")
+
+class ArchivedOrder(Base):
+    """Completed orders of closed sessions moved out of orders by archive_orders.py"""
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_store_created_id", "store_id", "created_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    table_session_id = Column(Integer, ForeignKey("table_sessions.id"), nullable=False, index=True)
+    order_number = Column(String(32), unique=True, nullable=False)
+    total_amount = Column(Integer, nullable=False)
+    status = Column(SQLEnum(OrderStatus), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class ArchivedOrderItem(Base):
+    __tablename__ = "order_items_archive"
+    
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders_archive.id"), nullable=False, index=True)
+    menu_id = Column(Integer, nullable=False)
+    menu_name = Column(String(100), nullable=False)
+    menu_price = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    subtotal = Column(Integer, nullable=False)
+    created_at = Column(DateTime)
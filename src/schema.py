@@ -0,0 +1,64 @@
+"""Schema migrations: thin wrapper over the Alembic scripts in migrations/"""
+import os
+from alembic import command, context, op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect
+from src.config import config
+from src.database import create_db_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Revision matching the original schema that create_all built at app startup
+BASELINE_REVISION = "0001"
+
+def alembic_config(url: str = None) -> Config:
+    cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    # ConfigParser interpolates %, which URL-encoded passwords may contain
+    cfg.set_main_option("sqlalchemy.url", (url or config.DATABASE_URL).replace("%", "%%"))
+    # Leave the caller's logging setup alone
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+def is_unversioned(url: str = None) -> bool:
+    """True for a database built by create_all before migrations existed"""
+    engine = create_db_engine(url or config.DATABASE_URL)
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    return "stores" in tables and "alembic_version" not in tables
+
+def upgrade(url: str = None, revision: str = "head", sql: bool = False):
+    """Apply migrations up to revision, or print their SQL when sql is set"""
+    cfg = alembic_config(url)
+    if not sql and is_unversioned(url):
+        command.stamp(cfg, BASELINE_REVISION)
+    command.upgrade(cfg, revision, sql=sql)
+
+def current_revision(url: str = None):
+    engine = create_db_engine(url or config.DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            return MigrationContext.configure(connection).get_current_revision()
+    finally:
+        engine.dispose()
+
+# Helpers for migration scripts. Before migrations existed the app ran
+# create_all on every start, which added new tables (never new columns)
+# to old databases, so revisions skip objects that are already there.
+
+def existing_tables() -> set:
+    if context.is_offline_mode():
+        return set()
+    return set(inspect(op.get_bind()).get_table_names())
+
+def existing_columns(table: str) -> set:
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in inspect(op.get_bind()).get_columns(table)}
+
+def existing_indexes(table: str) -> set:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in inspect(op.get_bind()).get_indexes(table)}
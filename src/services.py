@@ -1,11 +1,27 @@
 """Business logic services"""
+import hashlib
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from src.models import AdminUser, TableAuth, TableSession, Menu, Order, OrderItem, OrderStatus
+from sqlalchemy import DateTime, and_, case, delete, func, insert, literal, select, text, tuple_, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
+from src.models import (
+    Store, AdminUser, TableAuth, TableSession, Category, Menu, Order, OrderItem, OrderStatus, SalesRollup,
+    ArchivedOrder, ArchivedOrderItem
+)
 from src.utils import (
-    hash_password, verify_password, create_jwt_token, 
-    generate_session_token, is_session_expired
+    create_jwt_token, 
+    generate_session_token, is_session_expired, calculate_expiry_time,
+    password_pool,
+    encode_cursor, decode_cursor
 )
+from src.config import config
+from src.database import run_db
+from src.events import order_events
+from src.cache import menu_cache, session_cache, VerifiedSession
+from src.order_numbers import order_numbers
+from src.kitchen import kitchen_board
+from src.images import menu_images
+from src import metrics
 
 class AuthenticationError(Exception):
     pass
@@ -25,6 +41,9 @@ class ValidationError(Exception):
 class InvalidStatusTransitionError(Exception):
     pass
 
+LOCK_AFTER_FAILED_ATTEMPTS = 5
+LOCK_DURATION = timedelta(minutes=15)
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
@@ -37,25 +56,24 @@ class AuthService:
         ).first()
         
         if not admin:
+            metrics.logins_failed.inc("admin", "unknown_account")
             raise AuthenticationError("Invalid credentials")
         
         # Check if account is locked
         if admin.locked_until and admin.locked_until > datetime.utcnow():
             remaining = (admin.locked_until - datetime.utcnow()).seconds // 60
+            metrics.logins_failed.inc("admin", "locked")
             raise AccountLockedError(f"Account locked. Try again in {remaining} minutes")
         
         # Verify password
-        if not verify_password(password, admin.password_hash):
-            admin.failed_login_attempts += 1
-            if admin.failed_login_attempts >= 5:
-                admin.locked_until = datetime.utcnow() + timedelta(minutes=15)
-            self.db.commit()
+        if not password_pool.verify(password, admin.password_hash):
+            self._record_failed_attempt(AdminUser, admin.id)
+            metrics.logins_failed.inc("admin", "bad_password")
             raise AuthenticationError("Invalid credentials")
         
-        # Reset failed attempts on success
-        admin.failed_login_attempts = 0
-        admin.locked_until = None
-        self.db.commit()
+        # Reset failed attempts on success; nothing to write in the common case
+        if admin.failed_login_attempts or admin.locked_until:
+            self._reset_failed_attempts(AdminUser, admin.id)
         
         # Create JWT token
         token_data = {
@@ -73,31 +91,33 @@ class AuthService:
         ).first()
         
         if not table_auth:
+            metrics.logins_failed.inc("table", "unknown_account")
             raise AuthenticationError("Invalid credentials")
         
         # Check if account is locked
         if table_auth.locked_until and table_auth.locked_until > datetime.utcnow():
             remaining = (table_auth.locked_until - datetime.utcnow()).seconds // 60
+            metrics.logins_failed.inc("table", "locked")
             raise AccountLockedError(f"Account locked. Try again in {remaining} minutes")
         
         # Verify password
-        if not verify_password(password, table_auth.password_hash):
-            table_auth.failed_login_attempts += 1
-            if table_auth.failed_login_attempts >= 5:
-                table_auth.locked_until = datetime.utcnow() + timedelta(minutes=15)
-            self.db.commit()
+        if not password_pool.verify(password, table_auth.password_hash):
+            self._record_failed_attempt(TableAuth, table_auth.id)
+            metrics.logins_failed.inc("table", "bad_password")
             raise AuthenticationError("Invalid credentials")
         
-        # Reset failed attempts on success
-        table_auth.failed_login_attempts = 0
-        table_auth.locked_until = None
-        self.db.commit()
+        # Reset failed attempts on success; nothing to write in the common case
+        if table_auth.failed_login_attempts or table_auth.locked_until:
+            self._reset_failed_attempts(TableAuth, table_auth.id)
         
         # Create new session
         session_token = generate_session_token()
+        now = datetime.utcnow()
         session = TableSession(
             table_auth_id=table_auth.id,
             session_token=session_token,
+            created_at=now,
+            expired_at=calculate_expiry_time(now),
             is_active=True
         )
         self.db.add(session)
@@ -105,24 +125,63 @@ class AuthService:
         
         return session_token
     
-    def verify_session_token(self, token: str) -> TableSession:
+    def _record_failed_attempt(self, model, account_id: int):
+        """Count a failure and lock at the threshold in one atomic UPDATE"""
+        attempts = func.coalesce(model.failed_login_attempts, 0) + 1
+        self.db.execute(
+            update(model).where(model.id == account_id).values(
+                failed_login_attempts=attempts,
+                locked_until=case(
+                    (attempts >= LOCK_AFTER_FAILED_ATTEMPTS, datetime.utcnow() + LOCK_DURATION),
+                    else_=model.locked_until
+                )
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def _reset_failed_attempts(self, model, account_id: int):
+        self.db.execute(
+            update(model).where(model.id == account_id).values(
+                failed_login_attempts=0, locked_until=None
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def verify_session_token(self, token: str) -> VerifiedSession:
         """Verify session token and return session"""
-        session = self.db.query(TableSession).filter(
+        cached = _get_cached_session(token)
+        if cached:
+            return cached
+        
+        row = self.db.query(
+            TableSession, TableAuth.store_id, TableAuth.table_number
+        ).join(TableAuth, TableSession.table_auth_id == TableAuth.id).filter(
             TableSession.session_token == token
         ).first()
         
-        if not session:
+        if not row:
             raise InvalidTokenError("Invalid session token")
         
+        session, store_id, table_number = row
         if not session.is_active:
+            session_cache.invalidate(token)
             raise SessionExpiredError("Session is closed")
         
+        # Deactivation is left to the background sweeper; no write on the request path
         if is_session_expired(session):
-            session.is_active = False
-            self.db.commit()
+            session_cache.invalidate(token)
             raise SessionExpiredError("Session expired")
         
-        return session
+        verified = VerifiedSession(session, store_id, table_number)
+        session_cache.put(verified)
+        return verified
+
+def _get_cached_session(token: str):
+    """Cached session that has not reached its expiry yet"""
+    cached = session_cache.get(token)
+    if cached and datetime.utcnow() <= cached.expires_at:
+        return cached
+    return None
 
 class MenuService:
     def __init__(self, db: Session):
@@ -148,6 +207,51 @@ class MenuService:
             "categories": categories
         }
     
+    def get_menu_snapshot(self, store_id: int):
+        """Get the cached, pre-serialized menu payload for a store"""
+        return menu_cache.get(store_id, lambda: self._build_menu_payload(store_id))
+    
+    def _build_menu_payload(self, store_id: int) -> dict:
+        from src.models import Category
+        
+        # Column projections labelled with the API field names, no ORM hydration
+        menus = self.db.query(
+            Menu.id,
+            Menu.store_id.label("storeId"),
+            Menu.category_id.label("categoryId"),
+            Menu.name,
+            Menu.description,
+            Menu.price,
+            Menu.image_url.label("imageUrl"),
+            Menu.image_digest,
+            Menu.display_order.label("displayOrder"),
+            Menu.is_available.label("isAvailable")
+        ).filter(
+            Menu.store_id == store_id,
+            Menu.is_available == True
+        ).order_by(Menu.category_id, Menu.display_order)
+        
+        categories = self.db.query(
+            Category.id,
+            Category.store_id.label("storeId"),
+            Category.name,
+            Category.display_order.label("displayOrder")
+        ).filter(
+            Category.store_id == store_id
+        ).order_by(Category.display_order)
+        
+        return {
+            # Variant URLs come from the stored digest; no image is read here
+            "menus": [
+                {
+                    **{key: value for key, value in row._mapping.items() if key != "image_digest"},
+                    "imageVariants": menu_images.variant_urls(row.image_digest)
+                }
+                for row in menus
+            ],
+            "categories": [dict(row._mapping) for row in categories]
+        }
+    
     def create_menu(self, store_id: int, category_id: int, name: str, 
                    price: int, description: str = None, image_url: str = None):
         """Create new menu"""
@@ -160,11 +264,13 @@ class MenuService:
             name=name,
             price=price,
             description=description,
-            image_url=image_url
+            image_url=image_url,
+            image_digest=menu_images.prepare(image_url)
         )
         self.db.add(menu)
         self.db.commit()
         self.db.refresh(menu)
+        menu_cache.invalidate(store_id)
         return menu
     
     def update_menu(self, menu_id: int, **kwargs):
@@ -176,114 +282,537 @@ class MenuService:
         if 'price' in kwargs and kwargs['price'] <= 0:
             raise ValidationError("Price must be positive")
         
+        if "image_url" in kwargs:
+            kwargs["image_digest"] = menu_images.prepare(kwargs["image_url"])
         for key, value in kwargs.items():
             setattr(menu, key, value)
         
         self.db.commit()
         self.db.refresh(menu)
+        menu_cache.invalidate(menu.store_id)
         return menu
     
     def delete_menu(self, menu_id: int):
         """Delete menu"""
         menu = self.db.query(Menu).filter(Menu.id == menu_id).first()
         if menu:
+            store_id = menu.store_id
             self.db.delete(menu)
             self.db.commit()
+            menu_cache.invalidate(store_id)
+    
+    def apply_menu_batch(self, store_id: int, operations: list) -> dict:
+        """Validate a list of create/update/delete/reorder operations, then
+        apply them with set-based statements in one transaction"""
+        creates, updates, deletes = self._validate_menu_batch(store_id, operations)
+        now = datetime.utcnow()
+        digests = {}
+        for fields in (*creates, *updates.values()):
+            if "image_url" in fields:
+                if fields["image_url"] not in digests:
+                    digests[fields["image_url"]] = menu_images.prepare(fields["image_url"])
+                fields["image_digest"] = digests[fields["image_url"]]
+        
+        created_ids = []
+        if creates:
+            rows = [
+                {"store_id": store_id, "created_at": now, "updated_at": now, **fields}
+                for fields in creates
+            ]
+            created_ids = list(self.db.execute(
+                insert(Menu).returning(Menu.id, sort_by_parameter_order=True), rows
+            ).scalars())
+        if updates:
+            self.db.execute(update(Menu), [
+                {"id": menu_id, "updated_at": now, **fields} for menu_id, fields in updates.items()
+            ])
+        if deletes:
+            self.db.execute(
+                delete(Menu).where(Menu.id.in_(deletes)).execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+        
+        menu_cache.invalidate(store_id)
+        snapshot = self.get_menu_snapshot(store_id)
+        return {
+            "version": self.menu_version(store_id),
+            "etag": snapshot.etag,
+            "created_ids": created_ids,
+            "updated": len(updates),
+            "deleted": len(deletes)
+        }
+    
+    def prepare_menu_images(self) -> int:
+        """Render variants and store digests for menus saved before digests were kept"""
+        menus = self.db.query(Menu.id, Menu.store_id, Menu.image_url).filter(
+            Menu.image_url.isnot(None), Menu.image_digest.is_(None)
+        ).all()
+        digests = {}
+        for menu in menus:
+            if menu.image_url not in digests:
+                digests[menu.image_url] = menu_images.prepare(menu.image_url)
+        prepared = [menu for menu in menus if digests[menu.image_url]]
+        if prepared:
+            self.db.execute(update(Menu), [
+                {"id": menu.id, "image_digest": digests[menu.image_url]} for menu in prepared
+            ])
+            self.db.commit()
+        for store_id in {menu.store_id for menu in prepared}:
+            menu_cache.invalidate(store_id)
+        return len(prepared)
+    
+    def menu_version(self, store_id: int) -> str:
+        """Version of a store's menus, derived from the stored rows
+        
+        Every write sets updated_at, so any create, update or delete gives a
+        new version, the same in every worker and across restarts.
+        """
+        digest = hashlib.sha256()
+        rows = self.db.query(Menu.id, Menu.updated_at).filter(Menu.store_id == store_id).order_by(Menu.id)
+        for row in rows:
+            digest.update(f"{row.id}:{row.updated_at.isoformat() if row.updated_at else ''};".encode())
+        return digest.hexdigest()[:16]
+    
+    def _validate_menu_batch(self, store_id: int, operations: list):
+        """Check every operation before anything is written; all problems are reported together"""
+        from src.models import Category
+        
+        referenced = {op["menu_id"] for op in operations if op.get("menu_id") is not None}
+        known_menus = {
+            row.id for row in self.db.query(Menu.id).filter(
+                Menu.store_id == store_id, Menu.id.in_(referenced)
+            )
+        } if referenced else set()
+        category_ids = {op["category_id"] for op in operations if op.get("category_id") is not None}
+        known_categories = {
+            row.id for row in self.db.query(Category.id).filter(
+                Category.store_id == store_id, Category.id.in_(category_ids)
+            )
+        } if category_ids else set()
+        
+        errors = []
+        creates, updates, deletes = [], {}, set()
+        for index, op in enumerate(operations):
+            kind = op.get("op")
+            # Keys that are present, even as None, are set; absent keys stay unchanged
+            fields = {key: op[key] for key in MENU_BATCH_FIELDS.get(kind, ()) if key in op}
+            nulls = sorted(key for key, value in fields.items() if value is None and key not in MENU_BATCH_NULLABLE)
+            problem = None
+            if kind not in MENU_BATCH_FIELDS and kind != "delete":
+                problem = f"Unknown operation '{kind}'"
+            elif kind == "create" and not {"category_id", "name", "price"} <= fields.keys():
+                problem = "category_id, name and price are required"
+            elif nulls:
+                problem = f"{', '.join(nulls)} cannot be null"
+            elif kind != "create" and op.get("menu_id") not in known_menus:
+                problem = "Menu not found"
+            elif kind == "delete" and op["menu_id"] in deletes:
+                problem = "Menu is deleted twice"
+            elif kind != "create" and (op["menu_id"] in deletes or (kind == "delete" and op["menu_id"] in updates)):
+                problem = "Menu is both deleted and changed"
+            elif kind == "update" and not fields:
+                problem = "Nothing to update"
+            elif kind == "reorder" and "display_order" not in fields:
+                problem = "display_order is required"
+            elif "price" in fields and fields["price"] <= 0:
+                problem = "Price must be positive"
+            elif "category_id" in fields and fields["category_id"] not in known_categories:
+                problem = "Category not found"
+            
+            if problem:
+                errors.append(f"operations[{index}]: {problem}")
+            elif kind == "create":
+                creates.append(fields)
+            elif kind == "delete":
+                deletes.add(op["menu_id"])
+            else:
+                updates.setdefault(op["menu_id"], {}).update(fields)
+        
+        if errors:
+            raise ValidationError("; ".join(errors))
+        return creates, updates, deletes
+
+SESSION_SUMMARY_COLUMNS = (
+    TableSession.id.label("session_id"), TableSession.is_active, TableSession.order_count,
+    TableSession.total_amount, TableSession.item_count, TableSession.last_order_at
+)
+
+# Fields each menu batch operation may set
+MENU_BATCH_FIELDS = {
+    "create": ("category_id", "name", "price", "description", "image_url", "display_order", "is_available"),
+    "update": ("category_id", "name", "price", "description", "image_url", "display_order", "is_available"),
+    "reorder": ("display_order",),
+}
+# Menu batch fields that may be cleared with null
+MENU_BATCH_NULLABLE = ("description", "image_url")
+
+# Status an order must be in to move to the key status
+PREVIOUS_STATUS = {
+    OrderStatus.PREPARING: OrderStatus.PENDING,
+    OrderStatus.COMPLETED: OrderStatus.PREPARING,
+}
+
+# Hot tables and their archive; history reads union in the archive when needed
+ORDER_TABLES = ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
+
+# Columns served by order read paths
+def _order_columns(orders):
+    return (
+        orders.id, orders.store_id, orders.table_session_id, orders.order_number,
+        orders.total_amount, orders.status, orders.created_at, orders.updated_at
+    )
+
+def _order_item_columns(items):
+    return (
+        items.id, items.order_id, items.menu_id, items.menu_name,
+        items.menu_price, items.quantity, items.subtotal, items.created_at
+    )
+
+def _export_columns(orders, items):
+    return (
+        orders.id.label("order_id"), orders.order_number, orders.created_at, orders.status,
+        TableAuth.table_number, orders.table_session_id, orders.total_amount,
+        items.menu_id, items.menu_name, items.menu_price, items.quantity, items.subtotal,
+        items.id.label("item_id")
+    )
+
+ORDER_COLUMNS = _order_columns(Order)
+ORDER_ITEM_COLUMNS = _order_item_columns(OrderItem)
 
 class OrderService:
     def __init__(self, db: Session):
         self.db = db
     
-    def create_order(self, session_token: str, items: list):
+    def create_order(self, session_token: str, items: list, session: VerifiedSession = None):
         """Create new order"""
-        # Verify session
-        auth_service = AuthService(self.db)
-        session = auth_service.verify_session_token(session_token)
+        # Verify session unless the caller already did
+        if session is None:
+            session = AuthService(self.db).verify_session_token(session_token)
         
         # Validate items
         if not items:
             raise ValidationError("Order must have at least one item")
         
+        for item_data in items:
+            if item_data['quantity'] <= 0:
+                raise ValidationError("Quantity must be positive")
+        
+        # Resolve every menu in one query before opening the write
+        menu_ids = {item_data['menu_id'] for item_data in items}
+        menus = {
+            menu.id: menu
+            for menu in self.db.query(
+                Menu.id, Menu.store_id, Menu.name, Menu.price, Menu.is_available
+            ).filter(Menu.id.in_(menu_ids))
+        }
+        
+        missing = sorted(menu_ids - menus.keys())
+        if missing:
+            raise ValidationError(f"Menu {', '.join(map(str, missing))} not found")
+        
+        foreign = sorted(menu.id for menu in menus.values() if menu.store_id != session.store_id)
+        if foreign:
+            raise ValidationError(f"Menu {', '.join(map(str, foreign))} not found")
+        
+        unavailable = sorted(menu.name for menu in menus.values() if not menu.is_available)
+        if unavailable:
+            raise ValidationError(f"Menu not available: {', '.join(unavailable)}")
+        
+        item_rows = []
+        total = 0
+        for item_data in items:
+            menu = menus[item_data['menu_id']]
+            subtotal = menu.price * item_data['quantity']
+            item_rows.append({
+                "menu_id": menu.id,
+                "menu_name": menu.name,
+                "menu_price": menu.price,
+                "quantity": item_data['quantity'],
+                "subtotal": subtotal
+            })
+            total += subtotal
+        
         # Create order
-        order_number = f"ORD-{datetime.utcnow().strftime('%Y%m%d')}-{session.id:04d}"
+        order_number = order_numbers.next_number(self.db.get_bind(), session.store_id)
         order = Order(
-            store_id=session.table_auth.store_id,
+            store_id=session.store_id,
             table_session_id=session.id,
             order_number=order_number,
-            total_amount=0,
+            total_amount=total,
             status=OrderStatus.PENDING
         )
         self.db.add(order)
         self.db.flush()
         
-        # Create order items
-        total = 0
-        for item_data in items:
-            if item_data['quantity'] <= 0:
-                raise ValidationError("Quantity must be positive")
-            
-            menu = self.db.query(Menu).filter(Menu.id == item_data['menu_id']).first()
-            if not menu:
-                raise ValidationError(f"Menu {item_data['menu_id']} not found")
-            
-            subtotal = menu.price * item_data['quantity']
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_id=menu.id,
-                menu_name=menu.name,
-                menu_price=menu.price,
-                quantity=item_data['quantity'],
-                subtotal=subtotal
-            )
-            self.db.add(order_item)
-            total += subtotal
-        
-        order.total_amount = total
+        # Create order items with a single executemany
+        for row in item_rows:
+            row["order_id"] = order.id
+        self.db.execute(insert(OrderItem), item_rows)
         
-        # Update session last_order_at
-        session.last_order_at = datetime.utcnow()
+        # Update session last_order_at, the expiry derived from it and the running totals
+        ordered_at = datetime.utcnow()
+        self.db.query(TableSession).filter(TableSession.id == session.id).update({
+            TableSession.last_order_at: ordered_at,
+            TableSession.expired_at: calculate_expiry_time(session.created_at, ordered_at),
+            TableSession.order_count: TableSession.order_count + 1,
+            TableSession.total_amount: TableSession.total_amount + total,
+            TableSession.item_count: TableSession.item_count + sum(row["quantity"] for row in item_rows)
+        }, synchronize_session=False)
         
         self.db.commit()
-        self.db.refresh(order)
+        # Reload the order and its items in one query so callers can serialize it
+        # after an async session has handed it back
+        order = self.db.query(Order).options(
+            joinedload(Order.order_items)
+        ).filter(Order.id == order.id).populate_existing().one()
+        session_cache.invalidate(session.session_token)
+        metrics.orders_created.inc()
+        kitchen_board.order_created(order.store_id, order.id, [
+            (row["menu_id"], row["menu_name"], row["quantity"]) for row in item_rows
+        ])
+        
+        order_events.publish(order.store_id, "order-created", {
+            "order_id": order.id,
+            "order_number": order.order_number,
+            "table_session_id": session.id,
+            "table_number": session.table_number,
+            "total_amount": order.total_amount,
+            "status": order.status,
+            "created_at": order.created_at,
+            "items": [
+                {
+                    "menu_id": item.menu_id,
+                    "menu_name": item.menu_name,
+                    "quantity": item.quantity,
+                    "subtotal": item.subtotal
+                }
+                for item in order.order_items
+            ]
+        })
         return order
     
-    def get_orders_by_session(self, session_token: str):
+    def get_orders_by_session(self, session_token: str, session: VerifiedSession = None):
         """Get orders for a session"""
-        auth_service = AuthService(self.db)
-        session = auth_service.verify_session_token(session_token)
+        if session is None:
+            session = AuthService(self.db).verify_session_token(session_token)
         
-        return self.db.query(Order).filter(
+        orders = self.db.query(*ORDER_COLUMNS).filter(
             Order.table_session_id == session.id
         ).order_by(Order.created_at.desc()).all()
+        return self._with_items(orders)
+    
+    def get_orders_by_store(self, store_id: int, status: str = None, table_number: str = None,
+                            created_from: datetime = None, created_to: datetime = None,
+                            cursor: str = None, limit: int = 50):
+        """Get a page of a store's orders with their items, newest first
+        
+        Pages are keyed on (created_at, id) so each page costs one indexed
+        range scan plus one query for the items. The archive is only read
+        when the page is empty or reaches back past its newest order.
+        """
+        filters = (store_id, status, table_number, created_from, created_to)
+        position = None
+        if cursor:
+            position = decode_cursor(cursor)
+            if not position:
+                raise ValidationError("Invalid cursor")
+        
+        # The newest archived order rides along on every live row, so the
+        # page needs no separate query to decide whether to read the archive
+        newest_archived = select(func.max(ArchivedOrder.created_at)).where(
+            ArchivedOrder.store_id == store_id
+        ).scalar_subquery().label("newest_archived")
+        orders = self._order_page(Order, filters, position, limit, newest_archived)
+        include_archive = not orders or (orders[0].newest_archived is not None and (
+            len(orders) <= limit or orders[-1].created_at <= orders[0].newest_archived
+        ))
+        if include_archive:
+            orders = sorted(
+                orders + self._order_page(ArchivedOrder, filters, position, limit),
+                key=lambda o: (o.created_at, o.id), reverse=True
+            )[:limit + 1]
+        
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+        
+        return {"orders": self._with_items(orders, include_archive), "next_cursor": next_cursor}
+    
+    def _order_page(self, orders, filters: tuple, position, limit: int, *extra) -> list:
+        query = self.db.query(*_order_columns(orders), *extra).filter(*self._store_order_filters(*filters, orders=orders))
+        if position:
+            query = query.filter(tuple_(orders.created_at, orders.id) < position)
+        return query.order_by(orders.created_at.desc(), orders.id.desc()).limit(limit + 1).all()
+    
+    def export_orders(self, store_id: int, status: str = None, table_number: str = None,
+                      created_from: datetime = None, created_to: datetime = None,
+                      chunk_size: int = 1000):
+        """One row per order item, oldest order first, fetched chunk_size rows at a time
+        
+        Filters are checked before returning; the query itself runs on
+        the first iteration and holds a server-side cursor until the
+        last chunk, so memory use does not depend on the date range.
+        """
+        filters = (store_id, status, table_number, created_from, created_to)
+        rows = union_all(*[
+            select(*_export_columns(orders, items)).join(
+                items, items.order_id == orders.id
+            ).join(
+                TableSession, TableSession.id == orders.table_session_id
+            ).join(
+                TableAuth, TableAuth.id == TableSession.table_auth_id
+            ).where(*self._store_order_filters(*filters, orders=orders))
+            for orders, items in ORDER_TABLES
+        ]).subquery()
+        statement = select(rows).order_by(
+            rows.c.created_at, rows.c.order_id, rows.c.item_id
+        ).execution_options(yield_per=chunk_size)
+        return self._partitions(statement)
+    
+    def _partitions(self, statement):
+        result = self.db.execute(statement)
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+    
+    def _store_order_filters(self, store_id: int, status: str = None, table_number: str = None,
+                             created_from: datetime = None, created_to: datetime = None,
+                             orders=Order) -> list:
+        """Filter conditions shared by the admin order list and the export"""
+        conditions = [orders.store_id == store_id]
+        if status:
+            try:
+                conditions.append(orders.status == OrderStatus(status))
+            except ValueError:
+                raise ValidationError(f"Unknown status {status}")
+        if table_number:
+            conditions.append(orders.table_session_id.in_(
+                select(TableSession.id).join(TableAuth).where(
+                    TableAuth.store_id == store_id,
+                    TableAuth.table_number == table_number
+                )
+            ))
+        if created_from:
+            conditions.append(orders.created_at >= created_from)
+        if created_to:
+            conditions.append(orders.created_at < created_to)
+        return conditions
+    
+    def _with_items(self, orders, include_archive: bool = False) -> list:
+        """Turn projected order rows into dicts carrying their items"""
+        result = [
+            {key: value for key, value in row._mapping.items() if key != "newest_archived"}
+            for row in orders
+        ]
+        for order in result:
+            order["order_items"] = []
+        if not result:
+            return result
+        
+        by_id = {order["id"]: order for order in result}
+        for _, items in ORDER_TABLES[:2 if include_archive else 1]:
+            rows = self.db.query(*_order_item_columns(items)).filter(
+                items.order_id.in_(by_id.keys())
+            ).order_by(items.id)
+            for item in rows:
+                by_id[item.order_id]["order_items"].append(dict(item._mapping))
+        return result
     
     def update_order_status(self, order_id: int, new_status: str):
         """Update order status with validation"""
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
+        result = self.update_order_statuses([order_id], new_status)
+        if result["updated"]:
+            return result["updated"][0]
+        current = result["conflicts"][0]["current_status"]
+        if current is None:
             raise ValidationError("Order not found")
+        raise InvalidStatusTransitionError(f"Cannot transition from {current.value} to {new_status}")
+    
+    def update_order_statuses(self, order_ids: list, new_status: str, store_id: int = None) -> dict:
+        """Move orders to new_status with one conditional UPDATE
         
-        # Validate status transition
-        valid_transitions = {
-            OrderStatus.PENDING: [OrderStatus.PREPARING],
-            OrderStatus.PREPARING: [OrderStatus.COMPLETED],
-            OrderStatus.COMPLETED: []
-        }
-        
-        new_status_enum = OrderStatus(new_status)
-        if new_status_enum not in valid_transitions.get(order.status, []):
-            raise InvalidStatusTransitionError(
-                f"Cannot transition from {order.status.value} to {new_status}"
-            )
+        Only orders still in the status that precedes new_status change,
+        so two admins acting at once cannot both apply a transition.
+        The others are reported with their current status (None when
+        the order does not exist).
+        """
+        try:
+            new_status_enum = OrderStatus(new_status)
+        except ValueError:
+            raise ValidationError(f"Unknown status {new_status}")
+        order_ids = list(dict.fromkeys(order_ids))
+        scope = [Order.store_id == store_id] if store_id is not None else []
         
-        order.status = new_status_enum
+        updated = []
+        expected = PREVIOUS_STATUS.get(new_status_enum)
+        if expected is not None:
+            updated = self.db.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids), Order.status == expected, *scope)
+                .values(status=new_status_enum, updated_at=datetime.utcnow())
+                .returning(*ORDER_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+        done = {row.id for row in updated}
+        if new_status_enum == OrderStatus.COMPLETED and done:
+            # Same transaction as the status change
+            ReportService(self.db).record_completed_orders(done)
         self.db.commit()
-        self.db.refresh(order)
-        return order
+        
+        current = {}
+        if len(done) < len(order_ids):
+            current = dict(self.db.query(Order.id, Order.status).filter(
+                Order.id.in_([order_id for order_id in order_ids if order_id not in done]), *scope
+            ).all())
+        
+        metrics.order_status_changes.inc(new_status_enum.value, amount=len(updated))
+        for row in updated:
+            kitchen_board.status_changed(row.id, new_status_enum)
+            order_events.publish(row.store_id, "order-updated", {
+                "order_id": row.id,
+                "order_number": row.order_number,
+                "table_session_id": row.table_session_id,
+                "status": row.status,
+                "updated_at": row.updated_at
+            })
+        return {
+            "updated": [dict(row._mapping) for row in updated],
+            "conflicts": [
+                {"order_id": order_id, "current_status": current.get(order_id)}
+                for order_id in order_ids if order_id not in done
+            ]
+        }
 
 class SessionService:
     def __init__(self, db: Session):
         self.db = db
     
+    def get_session_summary(self, session_id: int) -> dict:
+        """Running totals of one session, read from the session row"""
+        row = self.db.query(*SESSION_SUMMARY_COLUMNS).filter(TableSession.id == session_id).first()
+        if not row:
+            raise ValidationError("Session not found")
+        return dict(row._mapping)
+    
+    def get_table_overview(self, store_id: int) -> list:
+        """Every table of a store with the totals of its active sessions, without scanning orders"""
+        rows = self.db.query(
+            TableAuth.id.label("table_id"),
+            TableAuth.table_number,
+            func.count(TableSession.id).label("active_sessions"),
+            func.coalesce(func.sum(TableSession.order_count), 0).label("order_count"),
+            func.coalesce(func.sum(TableSession.total_amount), 0).label("total_amount"),
+            func.coalesce(func.sum(TableSession.item_count), 0).label("item_count"),
+            func.max(TableSession.last_order_at).label("last_order_at")
+        ).outerjoin(TableSession, and_(
+            TableSession.table_auth_id == TableAuth.id, TableSession.is_active == True
+        )).filter(
+            TableAuth.store_id == store_id
+        ).group_by(TableAuth.id, TableAuth.table_number).order_by(TableAuth.id)
+        return [dict(row._mapping) for row in rows]
+    
     def close_session(self, session_id: int):
         """Close table session"""
         session = self.db.query(TableSession).filter(
@@ -294,3 +823,307 @@ class SessionService:
             session.is_active = False
             session.closed_at = datetime.utcnow()
             self.db.commit()
+            session_cache.invalidate(session.session_token)
+            
+            order_events.publish(session.table_auth.store_id, "session-closed", {
+                "table_session_id": session.id,
+                "table_number": session.table_auth.table_number,
+                "closed_at": session.closed_at
+            })
+    
+    def close_store_sessions(self, store_id: int) -> int:
+        """Close every active session of a store with one UPDATE"""
+        closed_at = datetime.utcnow()
+        rows = self._deactivate(
+            TableSession.table_auth_id.in_(
+                select(TableAuth.id).where(TableAuth.store_id == store_id)
+            ),
+            closed_at=closed_at
+        )
+        if rows:
+            table_numbers = dict(self.db.query(TableAuth.id, TableAuth.table_number).filter(
+                TableAuth.id.in_({row.table_auth_id for row in rows})
+            ).all())
+            for row in rows:
+                order_events.publish(store_id, "session-closed", {
+                    "table_session_id": row.id,
+                    "table_number": table_numbers.get(row.table_auth_id),
+                    "closed_at": closed_at
+                })
+        return len(rows)
+    
+    def expire_sessions(self, now: datetime = None) -> int:
+        """Deactivate every active session past its expired_at"""
+        now = now or datetime.utcnow()
+        self._backfill_expiry()
+        rows = self._deactivate(TableSession.expired_at <= now)
+        metrics.sessions_expired.inc(amount=len(rows))
+        return len(rows)
+    
+    def _deactivate(self, condition, closed_at: datetime = None) -> list:
+        """Set-based deactivation shared by the sweeper and bulk close"""
+        values = {TableSession.is_active: False}
+        if closed_at:
+            values[TableSession.closed_at] = closed_at
+        rows = self.db.execute(
+            update(TableSession)
+            .where(TableSession.is_active == True, condition)
+            .values(values)
+            .returning(TableSession.id, TableSession.session_token, TableSession.table_auth_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        for row in rows:
+            session_cache.invalidate(row.session_token)
+        return rows
+    
+    def _backfill_expiry(self):
+        """Fill expired_at for active sessions created before it was maintained"""
+        missing = self.db.query(
+            TableSession.id, TableSession.created_at, TableSession.last_order_at
+        ).filter(TableSession.is_active == True, TableSession.expired_at.is_(None)).all()
+        if missing:
+            self.db.execute(update(TableSession), [
+                {"id": row.id, "expired_at": calculate_expiry_time(row.created_at, row.last_order_at)}
+                for row in missing
+            ])
+            self.db.commit()
+
+class ReportService:
+    """Sales reports served from the sales_hourly rollup"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record_completed_orders(self, order_ids):
+        """Add newly completed orders to the rollup; the caller commits"""
+        self._add_to_rollup(self._sales_rows(lambda orders: [orders.id.in_(order_ids)]))
+    
+    def rebuild_sales_rollups(self, days: int = 7) -> dict:
+        """Recompute the rollup from order history, one store and days days per transaction
+        
+        Each window's rows are deleted and recomputed in the same
+        transaction, so reports keep reading the old totals until it
+        commits. Completing an order upserts the rollup, which waits for
+        the window's lock (PostgreSQL) or the database write lock (SQLite):
+        an order is either committed before the window reads it or added
+        after the window commits, never lost or counted twice. Archived
+        orders are included; both tables are read in one statement, so
+        an order archived meanwhile is counted once.
+        """
+        def completed(orders, store_id, start, end=None):
+            conditions = [
+                orders.store_id == store_id,
+                orders.created_at >= datetime.combine(start, datetime.min.time()),
+                orders.status == OrderStatus.COMPLETED,
+            ]
+            if end is not None:
+                conditions.append(orders.created_at < datetime.combine(end, datetime.min.time()))
+            return conditions
+        
+        def next_date(store_id, start):
+            """First day on or after start with completed orders or stale rollup rows"""
+            first = [
+                self.db.execute(select(func.min(orders.created_at)).where(*completed(orders, store_id, start))).scalar()
+                for orders, _ in ORDER_TABLES
+            ]
+            first = [value.date() for value in first if value is not None]
+            first.append(self.db.execute(select(func.min(SalesRollup.sales_date)).where(
+                SalesRollup.store_id == store_id, SalesRollup.sales_date >= start
+            )).scalar())
+            return min((value for value in first if value is not None), default=None)
+        
+        lock = self.db.get_bind().dialect.name == "postgresql"
+        order_ids = set()
+        for store_id in self.db.execute(select(Store.id).order_by(Store.id)).scalars().all():
+            start = next_date(store_id, datetime.min.date())
+            while start is not None:
+                end = start + timedelta(days=days)
+                if lock:
+                    # Blocks rollup upserts, not report reads, until this window commits
+                    self.db.execute(text("LOCK TABLE sales_hourly IN EXCLUSIVE MODE"))
+                self.db.execute(delete(SalesRollup).where(
+                    SalesRollup.store_id == store_id, SalesRollup.sales_date >= start, SalesRollup.sales_date < end
+                ))
+                rows = self._sales_rows(lambda orders: completed(orders, store_id, start, end), ORDER_TABLES)
+                self._add_to_rollup(rows)
+                self.db.commit()
+                order_ids.update(row.order_id for row in rows)
+                start = next_date(store_id, end)
+        return {"orders": len(order_ids), "rows": self.db.query(func.count()).select_from(SalesRollup).scalar()}
+    
+    def get_sales(self, store_id: int, date_from, date_to, group_by: str = "menu",
+                  granularity: str = "day") -> list:
+        """Quantity and revenue per day (or hour) and menu (or category)
+        
+        Menu rows also carry the number of orders that included the menu.
+        """
+        if group_by not in ("menu", "category") or granularity not in ("day", "hour"):
+            raise ValidationError("group_by must be menu or category, granularity day or hour")
+        period = [SalesRollup.sales_date]
+        if granularity == "hour":
+            period.append(SalesRollup.hour)
+        if group_by == "menu":
+            dimension, name = SalesRollup.menu_id, func.max(SalesRollup.menu_name).label("menu_name")
+        else:
+            dimension, name = SalesRollup.category_id, func.max(Category.name).label("category_name")
+        
+        query = self.db.query(
+            *period, dimension, name,
+            func.sum(SalesRollup.quantity).label("quantity"),
+            func.sum(SalesRollup.revenue).label("revenue"),
+            # Buckets count orders per menu; an order spans several menus of a category
+            *([func.sum(SalesRollup.order_count).label("order_count")] if group_by == "menu" else [])
+        ).filter(
+            SalesRollup.store_id == store_id,
+            SalesRollup.sales_date.between(date_from, date_to)
+        )
+        if group_by == "category":
+            query = query.outerjoin(Category, Category.id == SalesRollup.category_id)
+        rows = query.group_by(*period, dimension).order_by(*period, dimension)
+        return [dict(row._mapping) for row in rows]
+    
+    def _sales_rows(self, conditions, tables=ORDER_TABLES[:1]):
+        """Items of the matching orders, one row per order and menu
+        
+        conditions maps an orders table to its filter list.
+        """
+        return self.db.execute(union_all(*[
+            select(
+                orders.id.label("order_id"),
+                orders.store_id,
+                orders.created_at,
+                items.menu_id,
+                Menu.category_id,
+                func.max(items.menu_name).label("menu_name"),
+                func.sum(items.quantity).label("quantity"),
+                func.sum(items.subtotal).label("revenue")
+            ).join(items, items.order_id == orders.id).outerjoin(
+                Menu, Menu.id == items.menu_id
+            ).where(*conditions(orders)).group_by(
+                orders.id, orders.store_id, orders.created_at, items.menu_id, Menu.category_id
+            )
+            for orders, items in tables
+        ])).all()
+    
+    def _add_to_rollup(self, rows):
+        totals = {}
+        for row in rows:
+            key = (row.store_id, row.created_at.date(), row.created_at.hour, row.menu_id)
+            entry = totals.get(key)
+            if entry is None:
+                entry = totals[key] = {
+                    "store_id": key[0], "sales_date": key[1], "hour": key[2], "menu_id": key[3],
+                    "category_id": row.category_id, "menu_name": row.menu_name,
+                    "quantity": 0, "revenue": 0, "order_count": 0
+                }
+            entry["quantity"] += row.quantity
+            entry["revenue"] += row.revenue
+            entry["order_count"] += 1
+        if not totals:
+            return
+        
+        # INSERT ... ON CONFLICT DO UPDATE adds to an existing bucket atomically
+        dialect = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(SalesRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SalesRollup.store_id, SalesRollup.sales_date, SalesRollup.hour, SalesRollup.menu_id],
+            set_={
+                "category_id": stmt.excluded.category_id,
+                "menu_name": stmt.excluded.menu_name,
+                "quantity": SalesRollup.quantity + stmt.excluded.quantity,
+                "revenue": SalesRollup.revenue + stmt.excluded.revenue,
+                "order_count": SalesRollup.order_count + stmt.excluded.order_count
+            }
+        )
+        self.db.execute(stmt, list(totals.values()))
+
+class ArchiveService:
+    """Moves finished orders out of the hot orders / order_items tables"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def archive_orders(self, older_than: datetime = None, batch_size: int = None,
+                       max_batches: int = None) -> int:
+        """Archive completed orders of closed sessions created before older_than
+        
+        Each batch copies up to batch_size orders with their items and
+        deletes them from the hot tables in one transaction.
+        """
+        older_than = older_than or datetime.utcnow() - timedelta(hours=config.ARCHIVE_AFTER_HOURS)
+        batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+        archived, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            ids = self.db.execute(
+                select(Order.id).join(TableSession, TableSession.id == Order.table_session_id).where(
+                    Order.status == OrderStatus.COMPLETED,
+                    TableSession.is_active == False,
+                    Order.created_at < older_than
+                ).order_by(Order.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            self._move(ids, datetime.utcnow())
+            archived, batches = archived + len(ids), batches + 1
+        return archived
+    
+    def _move(self, ids: list, archived_at: datetime):
+        order_columns = [c.name for c in _order_columns(Order)]
+        item_columns = [c.name for c in _order_item_columns(OrderItem)]
+        self.db.execute(insert(ArchivedOrder).from_select(
+            order_columns + ["archived_at"],
+            select(*_order_columns(Order), literal(archived_at, DateTime)).where(Order.id.in_(ids))
+        ))
+        self.db.execute(insert(ArchivedOrderItem).from_select(
+            item_columns, select(*_order_item_columns(OrderItem)).where(OrderItem.order_id.in_(ids))
+        ))
+        self.db.execute(
+            delete(OrderItem).where(OrderItem.order_id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        self.db.execute(
+            delete(Order).where(Order.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+class AsyncService:
+    """Awaitable facade over a sync service
+
+    Each method runs the sync implementation through database.run_db: on
+    the event loop when given an AsyncSession, in the threadpool otherwise.
+    """
+    service_class = None
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def __getattr__(self, name):
+        method = getattr(self.service_class, name)
+        
+        async def call(*args, **kwargs):
+            return await run_db(
+                self.db, lambda session: method(self.service_class(session), *args, **kwargs)
+            )
+        return call
+
+class AsyncAuthService(AsyncService):
+    service_class = AuthService
+    
+    async def verify_session_token(self, token: str) -> VerifiedSession:
+        """Serve cached sessions without leaving the event loop"""
+        cached = _get_cached_session(token)
+        if cached:
+            return cached
+        return await run_db(self.db, lambda session: AuthService(session).verify_session_token(token))
+
+class AsyncMenuService(AsyncService):
+    service_class = MenuService
+
+class AsyncOrderService(AsyncService):
+    service_class = OrderService
+
+class AsyncSessionService(AsyncService):
+    service_class = SessionService
+
+class AsyncReportService(AsyncService):
+    service_class = ReportService
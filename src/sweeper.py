@@ -0,0 +1,90 @@
+"""Background maintenance jobs run on each worker's event loop"""
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from src.config import config
+from src.database import SessionLocal
+from src.kitchen import kitchen_board
+from src.services import SessionService
+
+logger = logging.getLogger(__name__)
+
+class PeriodicJob:
+    """Runs run_once in the threadpool every interval_seconds; 0 disables the loop"""
+    description = "Periodic job"
+    # Wait one interval before the first run
+    initial_delay = False
+
+    def __init__(self, interval_seconds: int):
+        self.interval_seconds = interval_seconds
+        self._task = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    async def _run(self):
+        if self.initial_delay:
+            await asyncio.sleep(self.interval_seconds)
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception(f"{self.description} failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start the loop on the running event loop"""
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+class SessionSweeper(PeriodicJob):
+    """Periodically deactivates sessions past expired_at with one UPDATE
+
+    Every worker runs its own sweeper; the UPDATE is idempotent, so
+    overlapping sweeps only cost an extra indexed scan.
+    """
+    description = "Session sweep"
+
+    def __init__(self, interval_seconds: int = None):
+        super().__init__(
+            config.SESSION_SWEEP_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        )
+
+    def sweep_once(self) -> int:
+        db = SessionLocal()
+        try:
+            return SessionService(db).expire_sessions()
+        finally:
+            db.close()
+
+    def run_once(self):
+        expired = self.sweep_once()
+        if expired:
+            logger.info(f"Expired {expired} table sessions")
+
+class KitchenResync(PeriodicJob):
+    """Rebuilds the kitchen board so it picks up orders handled by other workers"""
+    description = "Kitchen board rebuild"
+    initial_delay = True
+
+    def __init__(self, interval_seconds: int = None):
+        super().__init__(config.KITCHEN_RESYNC_SECONDS if interval_seconds is None else interval_seconds)
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            return kitchen_board.rebuild(db)
+        finally:
+            db.close()
+
+session_sweeper = SessionSweeper()
+kitchen_resync = KitchenResync()
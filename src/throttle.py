@@ -0,0 +1,115 @@
+"""Token-bucket throttling of login attempts"""
+import functools
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from src.config import config
+
+class LoginThrottledError(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucketLimiter:
+    """Bounded LRU of per-key token buckets
+
+    Each key starts with burst tokens and regains per_minute tokens a
+    minute. Keys beyond max_keys drop the least recently used bucket,
+    which only ever makes the limiter more lenient.
+    """
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int = 10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (tokens, updated_at)
+        self._buckets = OrderedDict()
+
+    def acquire(self, key) -> float:
+        """Take one token for key; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self._buckets.move_to_end(key)
+                return (1 - tokens) / self.rate if self.rate > 0 else 60.0
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def refund(self, key):
+        """Give back a token taken by acquire, up to burst"""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated_at = self._buckets[key]
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate + 1)
+                self._buckets[key] = (tokens, now)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+@functools.lru_cache(maxsize=8)
+def _networks(proxies: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+def client_address(peer: str, forwarded_for: str = None, trusted_proxies=None) -> str:
+    """Address of the client behind any trusted proxies
+
+    X-Forwarded-For is read right to left and only while each hop is a
+    trusted proxy, so a client cannot pick its own throttling key.
+    """
+    networks = _networks(tuple(config.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies))
+
+    def trusted(address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in networks)
+
+    address = peer
+    hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+    while trusted(address) and hops:
+        address = hops.pop()
+    return address
+
+class LoginThrottle:
+    """Rejects login attempts over the per-client or per-account rate before any DB or bcrypt work
+
+    Limits are per worker process, so with several workers the effective
+    rate is up to workers x the configured one.
+    """
+
+    def __init__(self):
+        self.by_client = TokenBucketLimiter(config.LOGIN_RATE_CLIENT_BURST, config.LOGIN_RATE_CLIENT_PER_MINUTE)
+        self.by_account = TokenBucketLimiter(config.LOGIN_RATE_ACCOUNT_BURST, config.LOGIN_RATE_ACCOUNT_PER_MINUTE)
+
+    def check(self, client: str, account: tuple):
+        """account identifies the login target, e.g. ("table", store_id, table_number)"""
+        if not config.LOGIN_THROTTLE_ENABLED:
+            return
+        wait = self.by_client.acquire(client) or self.by_account.acquire(account)
+        if wait:
+            raise LoginThrottledError("Too many login attempts", max(1, math.ceil(wait)))
+
+    def succeeded(self, client: str, account: tuple):
+        """Refund a successful login, so only failed attempts use up the budget"""
+        if not config.LOGIN_THROTTLE_ENABLED:
+            return
+        self.by_client.refund(client)
+        self.by_account.refund(account)
+
+    def clear(self):
+        self.by_client.clear()
+        self.by_account.clear()
+
+login_throttle = LoginThrottle()
@@ -1,5 +1,11 @@
 """Utility functions for security and session management"""
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import base64
+import multiprocessing
+import os
+import threading
 import bcrypt
 from jose import JWTError, jwt
 import uuid
@@ -17,6 +23,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception:
         return False
 
+class PasswordPoolBusyError(Exception):
+    pass
+
+class PasswordPool:
+    """Runs bcrypt in worker processes so login storms do not hold the GIL
+
+    At most max_pending calls may be running or queued; further calls fail
+    fast with PasswordPoolBusyError instead of tying up request threads.
+    """
+    
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = workers or config.PASSWORD_POOL_WORKERS or os.cpu_count() or 1
+        self.max_pending = max_pending or config.PASSWORD_POOL_MAX_PENDING or self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password)
+    
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(verify_password, plain_password, hashed_password)
+    
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusyError("Too many login attempts in progress")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            self.shutdown()
+            return fn(*args)
+        finally:
+            self._slots.release()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_pool = PasswordPool()
+
 # JWT token management
 def create_jwt_token(data: dict) -> str:
     """Create JWT token with expiration"""
@@ -53,5 +110,19 @@ def calculate_expiry_time(created_at: datetime, last_order_at: datetime = None)
 def is_session_expired(session) -> bool:
     """Check if session is expired"""
     now = datetime.utcnow()
-    expiry = calculate_expiry_time(session.created_at, session.last_order_at)
+    expiry = session.expired_at or calculate_expiry_time(session.created_at, session.last_order_at)
     return now > expiry
+
+# Keyset pagination cursors
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor: str):
+    """Decode a cursor; returns None if it is malformed"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeError):
+        return None
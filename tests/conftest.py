@@ -0,0 +1,45 @@
+"""Shared fixtures - a fresh SQLite database per test and the query budget"""
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.database import Base, track_queries
+from src.cache import menu_cache, session_cache
+from src.order_numbers import order_numbers
+from src.kitchen import kitchen_board
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+@pytest.fixture
+def engine(database_url):
+    """Engine on an empty schema; process-wide caches start cold"""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    menu_cache.clear()
+    session_cache.clear()
+    order_numbers.reset()
+    kitchen_board.clear()
+    yield engine
+    order_numbers.reset()
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield db
+    db.close()
+
+@contextmanager
+def _query_budget(max_queries: int):
+    with track_queries() as queries:
+        yield queries
+    assert queries.count <= max_queries, (
+        f"{queries.count} queries > budget {max_queries}:\n" + "\n".join(queries.statements)
+    )
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing when its block issues more SQL statements than the budget"""
+    return _query_budget
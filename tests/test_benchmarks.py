@@ -0,0 +1,37 @@
+"""Test cases for the load-test data generator"""
+import pytest
+from sqlalchemy import func
+from src.models import Store, TableAuth, TableSession, Menu, Order, OrderItem, OrderStatus
+from src.utils import verify_password
+from benchmarks.generate_data import generate, BENCH_PASSWORD
+from benchmarks.run import percentile
+
+def test_generate_builds_consistent_dataset(db):
+    counts = generate(db, stores=2, tables=3, menus=4, orders=10, items_per_order=2)
+    assert counts["orders"] == 10 and counts["order_items"] == 20
+    assert db.query(Store).count() == 2
+    assert db.query(TableAuth).count() == 6
+    assert db.query(Menu).count() == 8
+
+    # Orders only reference menus of their own store and totals add up
+    mismatched = db.query(OrderItem).join(Order).join(Menu, OrderItem.menu_id == Menu.id).filter(
+        Menu.store_id != Order.store_id
+    ).count()
+    assert mismatched == 0
+    assert db.query(func.sum(Order.total_amount)).scalar() == db.query(func.sum(OrderItem.subtotal)).scalar()
+    assert {o.status for o in db.query(Order)} == {OrderStatus.COMPLETED}
+    assert db.query(func.sum(TableSession.order_count)).scalar() == 10
+    assert db.query(func.sum(TableSession.total_amount)).scalar() == db.query(func.sum(Order.total_amount)).scalar()
+
+    table = db.query(TableAuth).first()
+    assert verify_password(BENCH_PASSWORD, table.password_hash)
+
+    with pytest.raises(RuntimeError):
+        generate(db, stores=1, tables=1, menus=1, orders=1)
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) == 0.0
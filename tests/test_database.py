@@ -0,0 +1,35 @@
+"""Test cases for the per-dialect engine factory"""
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from src.config import config
+from src.database import create_db_engine, engine_options, pool_stats
+
+# TC-BS-041: Postgres gets pool tuning without SQLite-only connect args
+def test_engine_options_per_dialect():
+    pg = engine_options("postgresql://user:pw@localhost/tableorder")
+    assert "connect_args" not in pg
+    assert pg["pool_size"] == config.DB_POOL_SIZE
+    assert pg["max_overflow"] == config.DB_MAX_OVERFLOW
+    assert pg["pool_pre_ping"] == config.DB_POOL_PRE_PING
+    assert pg["pool_recycle"] == config.DB_POOL_RECYCLE
+    
+    sqlite = engine_options("sqlite:///./app.db")
+    assert sqlite["connect_args"] == {"check_same_thread": False}
+    assert "pool_recycle" not in sqlite
+    assert "poolclass" not in engine_options("sqlite://")
+
+# TC-BS-042: File-backed SQLite connections run in WAL mode with the configured pragmas
+def test_sqlite_engine_pragmas(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    try:
+        with db_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == config.SQLITE_BUSY_TIMEOUT_MS
+            
+            stats = pool_stats(db_engine)
+            assert isinstance(db_engine.pool, QueuePool)
+            assert stats["checked_out"] == 1
+            assert stats["size"] == config.DB_POOL_SIZE
+    finally:
+        db_engine.dispose()
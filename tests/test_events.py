@@ -0,0 +1,81 @@
+"""Test cases for the admin order event broker"""
+import asyncio
+import json
+import pytest
+from src.events import OrderEventBroker
+
+async def _drain(subscriber):
+    events = []
+    while not subscriber.queue.empty():
+        event = subscriber.queue.get_nowait()
+        if event is None:
+            break
+        events.append(event)
+    return events
+
+# TC-BS-030: Events fan out only to subscribers of the same store
+@pytest.mark.asyncio
+async def test_publish_fans_out_per_store():
+    broker = OrderEventBroker(queue_size=10, replay_size=10)
+    store1, _ = broker.subscribe(1)
+    store2, _ = broker.subscribe(2)
+
+    broker.publish(1, "order-created", {"order_id": 7})
+    await asyncio.sleep(0)
+
+    events = await _drain(store1)
+    assert [e.event for e in events] == ["order-created"]
+    assert json.loads(events[0].data) == {"order_id": 7}
+    assert await _drain(store2) == []
+
+# TC-BS-031: Reconnect with Last-Event-ID replays missed events
+@pytest.mark.asyncio
+async def test_subscribe_replays_after_last_event_id():
+    broker = OrderEventBroker(queue_size=10, replay_size=10)
+    first = broker.publish(1, "order-created", {"order_id": 1})
+    broker.publish(1, "order-updated", {"order_id": 1})
+    broker.publish(2, "order-created", {"order_id": 2})
+
+    _, replay = broker.subscribe(1, last_event_id=first.id)
+    assert [e.event for e in replay] == ["order-updated"]
+
+@pytest.mark.asyncio
+async def test_subscribe_requests_resync_when_history_evicted():
+    broker = OrderEventBroker(queue_size=10, replay_size=2)
+    first = broker.publish(1, "order-created", {"order_id": 1})
+    for order_id in range(2, 5):
+        broker.publish(1, "order-created", {"order_id": order_id})
+
+    _, replay = broker.subscribe(1, last_event_id=first.id)
+    assert [e.event for e in replay] == ["resync"]
+
+# TC-BS-063: An event id from before a restart or from another worker requests a resync
+@pytest.mark.asyncio
+async def test_subscribe_requests_resync_for_foreign_event_id():
+    before = OrderEventBroker(queue_size=10, replay_size=10)
+    stale = before.publish(1, "order-created", {"order_id": 1}).to_sse()["id"]
+
+    # The restarted broker's counter has moved past the stale id
+    broker = OrderEventBroker(queue_size=10, replay_size=10)
+    for order_id in range(2, 5):
+        latest = broker.publish(1, "order-created", {"order_id": order_id})
+    resume_from = broker.parse_event_id(stale)
+    assert resume_from is None
+    _, replay = broker.subscribe(1, resume_from, resync=True)
+    assert [(e.event, e.id) for e in replay] == [("resync", latest.id)]
+
+    assert broker.parse_event_id("3") is None
+    assert broker.parse_event_id(f"{broker.epoch}-x") is None
+    _, replay = broker.subscribe(1, broker.parse_event_id(f"{broker.epoch}-1"))
+    assert [json.loads(e.data) for e in replay] == [{"order_id": 3}, {"order_id": 4}]
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_disconnected_on_overflow():
+    broker = OrderEventBroker(queue_size=2, replay_size=10)
+    subscriber, _ = broker.subscribe(1)
+    for order_id in range(3):
+        broker.publish(1, "order-created", {"order_id": order_id})
+    await asyncio.sleep(0)
+
+    assert subscriber.closed
+    assert [e async for e in subscriber] == []
@@ -0,0 +1,59 @@
+"""Test cases for the streaming order export"""
+import csv
+import io
+import json
+import pytest
+from src.models import Store, TableAuth, TableSession, Category, Menu
+from src.services import OrderService, ValidationError
+from src.exports import csv_chunks, ndjson_chunks
+
+@pytest.fixture
+def orders(db):
+    store = Store(name="Test Store")
+    db.add(store)
+    db.flush()
+    table = TableAuth(store_id=store.id, table_number="7", password_hash="x")
+    category = Category(store_id=store.id, name="Main")
+    db.add_all([table, category])
+    db.flush()
+    db.add(TableSession(table_auth_id=table.id, session_token="export-token", is_active=True))
+    menus = [
+        Menu(store_id=store.id, category_id=category.id, name="불고기", price=15000),
+        Menu(store_id=store.id, category_id=category.id, name="Kimchi", price=3000),
+    ]
+    db.add_all(menus)
+    db.commit()
+
+    order_service = OrderService(db)
+    return store.id, [
+        order_service.create_order("export-token", [
+            {"menu_id": menus[0].id, "quantity": 1}, {"menu_id": menus[1].id, "quantity": 2}
+        ]).id,
+        order_service.create_order("export-token", [{"menu_id": menus[1].id, "quantity": 1}]).id,
+    ]
+
+# TC-BS-049: CSV export streams one row per item in small chunks after an early header
+def test_export_csv_in_chunks(db, orders):
+    store_id, order_ids = orders
+    chunks = list(csv_chunks(OrderService(db).export_orders(store_id, chunk_size=1)))
+    assert len(chunks) == 4
+    assert chunks[0].startswith("\ufeff".encode("utf-8") + b"order_id,order_number")
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+    assert [int(r["order_id"]) for r in rows] == [order_ids[0], order_ids[0], order_ids[1]]
+    assert [(r["menu_name"], r["subtotal"], r["table_number"]) for r in rows][:2] == [
+        ("불고기", "15000", "7"), ("Kimchi", "6000", "7")
+    ]
+
+# TC-BS-050: NDJSON export groups items under their order across chunk boundaries
+def test_export_ndjson_groups_items(db, orders):
+    store_id, order_ids = orders
+    body = b"".join(ndjson_chunks(OrderService(db).export_orders(store_id, chunk_size=1)))
+    exported = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert [o["order_id"] for o in exported] == order_ids
+    assert [len(o["order_items"]) for o in exported] == [2, 1]
+    assert exported[0]["total_amount"] == 21000 and exported[0]["status"] == "pending"
+
+    assert list(ndjson_chunks(OrderService(db).export_orders(store_id, status="completed"))) == []
+    with pytest.raises(ValidationError):
+        OrderService(db).export_orders(store_id, status="lost")
@@ -0,0 +1,65 @@
+"""Test cases for order idempotency keys"""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models import IdempotencyKey
+from src.idempotency import (
+    IdempotencyStore, MemoryIdempotencyBackend, DatabaseIdempotencyBackend,
+    IdempotencyConflictError, IdempotencyInFlightError, request_fingerprint
+)
+
+@pytest.fixture(params=["memory", "database"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryIdempotencyBackend()
+    return DatabaseIdempotencyBackend(request.getfixturevalue("engine"))
+
+ITEMS = [{"menu_id": 1, "quantity": 2}]
+
+# TC-BS-043: A completed key replays its response; a different body is rejected
+@pytest.mark.asyncio
+async def test_replay_and_fingerprint_conflict(backend):
+    store = IdempotencyStore(backend, ttl_seconds=60, lease_seconds=5, wait_seconds=0)
+    fingerprint = request_fingerprint(ITEMS)
+    assert fingerprint == request_fingerprint([{"quantity": 2, "menu_id": 1}])
+
+    assert await store.begin("1:abc", fingerprint) is None
+    await store.complete("1:abc", 200, b'{"id":7}')
+
+    record = await store.begin("1:abc", fingerprint)
+    assert (record.status_code, record.body) == (200, b'{"id":7}')
+    with pytest.raises(IdempotencyConflictError):
+        await store.begin("1:abc", request_fingerprint([{"menu_id": 1, "quantity": 3}]))
+
+# TC-BS-044: A concurrent duplicate waits for the in-flight request instead of running
+@pytest.mark.asyncio
+async def test_duplicate_waits_for_in_flight(backend):
+    store = IdempotencyStore(backend, ttl_seconds=60, lease_seconds=5, wait_seconds=2, poll_seconds=0.01)
+    fingerprint = request_fingerprint(ITEMS)
+    assert await store.begin("1:dup", fingerprint) is None
+
+    waiter = asyncio.create_task(store.begin("1:dup", fingerprint))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+    await store.complete("1:dup", 200, b'{"id":8}')
+    assert (await waiter).body == b'{"id":8}'
+
+    impatient = IdempotencyStore(backend, lease_seconds=5, wait_seconds=0)
+    assert await impatient.begin("1:slow", fingerprint) is None
+    with pytest.raises(IdempotencyInFlightError):
+        await impatient.begin("1:slow", fingerprint)
+
+# TC-BS-045: Released and expired keys can be claimed again
+@pytest.mark.asyncio
+async def test_release_and_expiry(backend):
+    store = IdempotencyStore(backend, ttl_seconds=60, lease_seconds=5, wait_seconds=0)
+    fingerprint = request_fingerprint(ITEMS)
+    assert await store.begin("1:retry", fingerprint) is None
+    await store.release("1:retry")
+    assert await store.begin("1:retry", fingerprint) is None
+
+    if isinstance(backend, DatabaseIdempotencyBackend):
+        with backend.bind.begin() as conn:
+            conn.execute(update(IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        assert await store.begin("1:retry", fingerprint) is None
@@ -0,0 +1,127 @@
+"""Test cases for menu image variants"""
+import io
+import json
+import pytest
+from src.models import Store, Category, Menu
+from src.services import MenuService
+from src.images import LocalImageStorage, VariantCache, MenuImages
+
+Image = pytest.importorskip("PIL.Image")
+
+def jpeg(width: int, height: int, color=(200, 40, 40)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = MenuImages(
+        LocalImageStorage(tmp_path / "bucket"), VariantCache(tmp_path / "cache", 1024 * 1024),
+        widths=(160, 320)
+    )
+    monkeypatch.setattr("src.services.menu_images", service)
+    return service
+
+# TC-BS-059: Saving a menu renders WebP variants that the menu payload links to
+def test_menu_image_variants(db, service):
+    service.storage.put("menus/bulgogi.jpg", jpeg(800, 600))
+    service.storage.put("menus/kimchi.jpg", jpeg(100, 50))
+    store = Store(name="Test Store")
+    db.add(store)
+    db.flush()
+    category = Category(store_id=store.id, name="Main")
+    db.add(category)
+    db.commit()
+
+    menu_service = MenuService(db)
+    menu_service.create_menu(
+        store.id, category.id, "Bulgogi", 15000,
+        image_url="https://tableorder-menu-images.s3.amazonaws.com/menus/bulgogi.jpg"
+    )
+    kimchi = menu_service.create_menu(store.id, category.id, "Kimchi", 3000, image_url="/menus/kimchi.jpg")
+    menu_service.create_menu(store.id, category.id, "Rice", 1000, image_url="/menus/missing.jpg")
+
+    menus = json.loads(menu_service.get_menu_snapshot(store.id).body)["menus"]
+    variants = [menu["imageVariants"] for menu in menus]
+    assert variants[2] is None
+    assert set(variants[0]) == {"160", "320"}
+    digest = variants[0]["160"].split("/")[3]
+    assert variants[0]["320"] == f"/api/images/{digest}/320.webp"
+
+    with Image.open(io.BytesIO(service.get_variant(digest, 320))) as variant:
+        assert variant.format == "WEBP" and variant.size == (320, 240)
+    # Narrow originals are re-encoded, not upscaled
+    kimchi_digest = variants[1]["320"].split("/")[3]
+    with Image.open(io.BytesIO(service.get_variant(kimchi_digest, 320))) as variant:
+        assert variant.size == (100, 50)
+    assert service.get_variant(digest, 640) is None
+    assert service.get_variant("../../etc", 160) is None
+
+    # Replacing the original under the same key moves the menu to new, content-addressed URLs
+    service.storage.put("menus/kimchi.jpg", jpeg(100, 50, color=(20, 160, 20)))
+    menu_service.update_menu(kimchi.id, image_url="/menus/kimchi.jpg")
+    menus = json.loads(menu_service.get_menu_snapshot(store.id).body)["menus"]
+    assert menus[1]["imageVariants"]["320"] != variants[1]["320"]
+    assert service.get_variant(kimchi_digest, 320) is not None
+
+# TC-BS-060: The variant cache evicts least recently read files and re-renders on demand
+def test_variant_cache_eviction(tmp_path, service):
+    service.storage.put("a.jpg", jpeg(640, 480, color=(10, 10, 10)))
+    service.storage.put("b.jpg", jpeg(640, 480, color=(250, 250, 250)))
+    a = service.prepare("a.jpg")
+    b = service.prepare("b.jpg")
+    total = sum(service.cache._index().values())
+
+    # Room for only three of the four files: reading a's variants keeps them
+    cache = VariantCache(tmp_path / "cache", total - 1)
+    service.cache = cache
+    assert cache.get(a, 160) and cache.get(a, 320)
+    cache.put(b, 320, cache.get(b, 320))
+    assert not (tmp_path / "cache" / "variants" / b[:2] / f"{b}-160.webp").exists()
+    assert cache.get(a, 160) is not None
+
+    # An evicted variant is rendered again from the original
+    assert service.get_variant(b, 160) is not None
+    assert (tmp_path / "cache" / "variants" / b[:2] / f"{b}-160.webp").exists()
+
+    # Other workers find the original through the manifest on disk
+    other = MenuImages(service.storage, cache, widths=(160, 320))
+    cache.put(b, 320, cache.get(b, 320))
+    cache.put(b, 160, cache.get(b, 160))
+    assert not (tmp_path / "cache" / "variants" / a[:2] / f"{a}-320.webp").exists()
+    assert other.get_variant(a, 320) is not None
+
+# TC-BS-062: Menu payloads build variant URLs from the stored digest without reading images
+def test_menu_payload_reads_no_images(db, service, monkeypatch):
+    service.storage.put("menus/bibimbap.jpg", jpeg(640, 480))
+    store = Store(name="Test Store")
+    db.add(store)
+    db.flush()
+    category = Category(store_id=store.id, name="Main")
+    db.add(category)
+    db.commit()
+    menu_service = MenuService(db)
+    menu = menu_service.create_menu(store.id, category.id, "Bibimbap", 11000, image_url="/menus/bibimbap.jpg")
+    assert menu.image_digest
+    # A menu saved before digests were stored, and one whose image is missing
+    db.add_all([
+        Menu(store_id=store.id, category_id=category.id, name="Legacy", price=9000, image_url="/menus/bibimbap.jpg"),
+        Menu(store_id=store.id, category_id=category.id, name="Rice", price=1000, image_url="/menus/missing.jpg"),
+    ])
+    db.commit()
+
+    def no_reads(key):
+        raise AssertionError(f"storage read while building the payload: {key}")
+    get = service.storage.get
+    monkeypatch.setattr(service.storage, "get", no_reads)
+    menus = json.loads(menu_service.get_menu_snapshot(store.id).body)["menus"]
+    assert menus[0]["imageVariants"]["160"] == f"/api/images/{menu.image_digest}/160.webp"
+    assert "image_digest" not in menus[0]
+    assert [m["imageVariants"] for m in menus[1:]] == [None, None]
+
+    # The backfill fills in digests for images that exist; the payload then links them
+    monkeypatch.setattr(service.storage, "get", get)
+    assert menu_service.prepare_menu_images() == 1
+    menus = json.loads(menu_service.get_menu_snapshot(store.id).body)["menus"]
+    assert menus[1]["imageVariants"] == menus[0]["imageVariants"]
+    assert menus[2]["imageVariants"] is None
@@ -0,0 +1,38 @@
+"""Test cases for the metrics registry"""
+from src.metrics import MetricsRegistry, Counter, Gauge, Histogram
+
+# TC-BS-037: Histograms render cumulative buckets per label set
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0), registry=registry)
+    latency.observe(0.05, "/api/orders")
+    latency.observe(0.5, "/api/orders")
+    latency.observe(3.0, "/api/orders")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/api/orders",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/api/orders",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/api/orders",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/api/orders"} 3' in text
+    assert latency.count("/api/orders") == 3
+
+# TC-BS-038: Counters and gauges keep one series per label set
+def test_counter_and_gauge_series():
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests", ("status",), registry=registry)
+    requests.inc("200")
+    requests.inc("200")
+    requests.inc("500", amount=3)
+    in_flight = Gauge("in_flight", "In flight", registry=registry)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    pool = Gauge("pool_checked_out", "Checked out", callback=lambda: 4, registry=registry)
+
+    text = registry.render()
+    assert 'requests_total{status="200"} 2' in text
+    assert 'requests_total{status="500"} 3' in text
+    assert "in_flight 1" in text
+    assert "pool_checked_out 4" in text
+    assert requests.value("200") == 2
@@ -0,0 +1,210 @@
+"""Test cases for schema migrations and index coverage of service queries"""
+import pytest
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table, Text,
+    create_engine, event, inspect, text
+)
+from sqlalchemy.orm import sessionmaker
+from src import schema
+from src.database import Base
+from src.models import Store, AdminUser, TableAuth, Category, Menu
+from src.services import (
+    AuthService, MenuService, OrderService, SessionService, ReportService, ArchiveService,
+    AuthenticationError
+)
+from src.utils import hash_password
+from src.cache import menu_cache, session_cache
+from src.order_numbers import order_numbers
+from src.kitchen import kitchen_board
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'schema.db'}"
+
+@pytest.fixture
+def migrated(url):
+    schema.upgrade(url)
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+def baseline_metadata() -> MetaData:
+    """The models as they were before migrations, when create_all built the schema"""
+    metadata = MetaData()
+    def table(name, *columns, **kwargs):
+        return Table(
+            name, metadata, Column("id", Integer, primary_key=True, index=True), *columns,
+            Column("created_at", DateTime), **kwargs
+        )
+    def store_id():
+        return Column("store_id", Integer, ForeignKey("stores.id"), nullable=False)
+    table("stores", Column("name", String(100), nullable=False), Column("updated_at", DateTime))
+    table(
+        "admin_users", store_id(), Column("username", String(50), nullable=False),
+        Column("password_hash", String(255), nullable=False), Column("failed_login_attempts", Integer),
+        Column("locked_until", DateTime), Column("updated_at", DateTime), sqlite_autoincrement=True
+    )
+    table(
+        "table_auths", store_id(), Column("table_number", String(20), nullable=False),
+        Column("password_hash", String(255), nullable=False), Column("failed_login_attempts", Integer),
+        Column("locked_until", DateTime), Column("updated_at", DateTime)
+    )
+    table(
+        "table_sessions", Column("table_auth_id", Integer, ForeignKey("table_auths.id"), nullable=False),
+        Column("session_token", String(255), unique=True, nullable=False, index=True),
+        Column("last_order_at", DateTime), Column("expired_at", DateTime), Column("closed_at", DateTime),
+        Column("is_active", Boolean)
+    )
+    table(
+        "categories", store_id(), Column("name", String(50), nullable=False),
+        Column("display_order", Integer), Column("updated_at", DateTime)
+    )
+    table(
+        "menus", store_id(), Column("category_id", Integer, ForeignKey("categories.id"), nullable=False),
+        Column("name", String(100), nullable=False), Column("description", Text),
+        Column("price", Integer, nullable=False), Column("image_url", String(500)),
+        Column("display_order", Integer), Column("is_available", Boolean), Column("updated_at", DateTime)
+    )
+    table(
+        "orders", store_id(), Column("table_session_id", Integer, ForeignKey("table_sessions.id"), nullable=False),
+        Column("order_number", String(20), unique=True, nullable=False, index=True),
+        Column("total_amount", Integer, nullable=False),
+        Column("status", Enum("PENDING", "PREPARING", "COMPLETED", name="orderstatus")),
+        Column("updated_at", DateTime)
+    )
+    table(
+        "order_items", Column("order_id", Integer, ForeignKey("orders.id"), nullable=False),
+        Column("menu_id", Integer, ForeignKey("menus.id"), nullable=False),
+        Column("menu_name", String(100), nullable=False), Column("menu_price", Integer, nullable=False),
+        Column("quantity", Integer, nullable=False), Column("subtotal", Integer, nullable=False)
+    )
+    return metadata
+
+# TC-BS-057: Migrations build exactly the schema the models describe
+def test_migrations_match_models(migrated, url):
+    assert schema.current_revision(url) == "0009"
+    with migrated.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+    # The baseline revision is the schema create_all built before migrations
+    command.downgrade(schema.alembic_config(url), schema.BASELINE_REVISION)
+    with migrated.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), baseline_metadata()) == []
+
+# TC-BS-061: A database built by create_all before migrations is stamped and upgraded in place
+def test_upgrade_unversioned_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    baseline_metadata().create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for statement in [
+            "INSERT INTO stores (id, name) VALUES (1, 'Test Store')",
+            "INSERT INTO categories (id, store_id, name) VALUES (1, 1, 'Main')",
+            "INSERT INTO menus (id, store_id, category_id, name, price, is_available) VALUES (1, 1, 1, 'Bulgogi', 15000, 1)",
+            "INSERT INTO table_auths (id, store_id, table_number, password_hash) VALUES (1, 1, '1', 'x')",
+            "INSERT INTO table_sessions (id, table_auth_id, session_token, is_active, created_at) "
+            "VALUES (1, 1, 'legacy-token', 1, :now)",
+            "INSERT INTO orders (id, store_id, table_session_id, order_number, total_amount, status, created_at) "
+            "VALUES (1, 1, 1, 'ORD-1', 30000, 'COMPLETED', :now)",
+            "INSERT INTO order_items (order_id, menu_id, menu_name, menu_price, quantity, subtotal) "
+            "VALUES (1, 1, 'Bulgogi', 15000, 2, 30000)",
+        ]:
+            connection.execute(text(statement), {"now": now})
+
+    assert schema.is_unversioned(url)
+    schema.upgrade(url)
+    assert schema.current_revision(url) == "0009"
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+        totals = connection.execute(text("SELECT order_count, total_amount, item_count FROM table_sessions")).one()
+    assert tuple(totals) == (1, 30000, 2)
+
+    # Orders get today's longer numbers on the upgraded schema
+    columns = {column["name"]: column["type"] for column in inspect(engine).get_columns("orders")}
+    assert columns["order_number"].length == 32
+    menu_cache.clear()
+    session_cache.clear()
+    order_numbers.reset()
+    kitchen_board.clear()
+    db = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        order = OrderService(db).create_order("legacy-token", [{"menu_id": 1, "quantity": 1}])
+        assert order.order_number.startswith("ORD-")
+        assert SessionService(db).get_table_overview(1)[0]["total_amount"] == 45000
+    finally:
+        db.close()
+        engine.dispose()
+
+# TC-BS-058: Every statement the services issue is served by an index, not a table scan
+def test_service_queries_use_indexes(migrated):
+    menu_cache.clear()
+    session_cache.clear()
+    order_numbers.reset()
+    kitchen_board.clear()
+    db = sessionmaker(autoflush=False, bind=migrated)()
+
+    store = Store(name="Test Store")
+    db.add(store)
+    db.flush()
+    password_hash = hash_password("password123")
+    category = Category(store_id=store.id, name="Main")
+    db.add_all([
+        AdminUser(store_id=store.id, username="admin", password_hash=password_hash),
+        TableAuth(store_id=store.id, table_number="1", password_hash=password_hash),
+        category,
+    ])
+    db.flush()
+    menu = Menu(store_id=store.id, category_id=category.id, name="Bulgogi", price=15000)
+    db.add(menu)
+    db.commit()
+
+    statements = {}
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.setdefault(statement, parameters)
+    event.listen(migrated, "before_cursor_execute", capture)
+    try:
+        auth = AuthService(db)
+        auth.login_admin(store.id, "admin", "password123")
+        with pytest.raises(AuthenticationError):
+            auth.login_admin(store.id, "admin", "wrong")
+        token = auth.login_table(store.id, "1", "password123")
+        auth.verify_session_token(token)
+
+        menus = MenuService(db)
+        menus.get_menus_by_store(store.id)
+        menus.get_menu_snapshot(store.id)
+
+        orders = OrderService(db)
+        order = orders.create_order(token, [{"menu_id": menu.id, "quantity": 2}])
+        orders.get_orders_by_session(token)
+        orders.get_orders_by_store(store.id, status="pending", table_number="1")
+        list(orders.export_orders(store.id))
+        orders.update_order_status(order.id, "preparing")
+        orders.update_order_status(order.id, "completed")
+        kitchen_board.rebuild(db)
+
+        today = datetime.utcnow().date()
+        ReportService(db).get_sales(store.id, today, today)
+        ReportService(db).rebuild_sales_rollups()
+        sessions = SessionService(db)
+        sessions.get_table_overview(store.id)
+        sessions.expire_sessions()
+        sessions.close_store_sessions(store.id)
+        ArchiveService(db).archive_orders(older_than=datetime.utcnow() + timedelta(hours=1))
+    finally:
+        event.remove(migrated, "before_cursor_execute", capture)
+        db.close()
+
+    scans = []
+    with migrated.connect() as connection:
+        for statement, parameters in statements.items():
+            plan = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            scans += [(step, statement) for step in plan if step.startswith("SCAN ") and " INDEX " not in step]
+    assert len(statements) > 30
+    assert scans == []
@@ -1,26 +1,22 @@
 """Test cases for services - Skeleton for TDD"""
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from src.database import Base
-from src.models import Store, AdminUser, TableAuth, TableSession, Menu, Category
-from src.services import AuthService, MenuService, OrderService, SessionService
-from src.services import AuthenticationError, AccountLockedError, ValidationError
-from src.utils import hash_password
-
-# Test database setup
-TEST_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-@pytest.fixture
-def db():
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    yield db
-    db.close()
-    Base.metadata.drop_all(bind=engine)
+from src.models import Store, AdminUser, TableAuth, TableSession, Menu, Category, Order, OrderItem, OrderStatus
+from src.models import ArchivedOrder, ArchivedOrderItem, SalesRollup
+from src.services import AuthService, MenuService, OrderService, SessionService, ReportService, ArchiveService
+from src.services import AuthenticationError, AccountLockedError, ValidationError, InvalidStatusTransitionError
+from src.services import SessionExpiredError, AsyncOrderService
+from src.database import to_async_url, track_queries
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.utils import hash_password, PasswordPool, PasswordPoolBusyError
+from src.events import order_events
+from src.cache import menu_cache, session_cache
+from src.order_numbers import OrderNumberAllocator
+from src.kitchen import kitchen_board, KitchenBoard
+from src import metrics
 
 @pytest.fixture
 def sample_store(db):
@@ -42,6 +38,46 @@ def sample_admin(db, sample_store):
     db.refresh(admin)
     return admin
 
+@pytest.fixture
+def sample_table(db, sample_store):
+    table = TableAuth(
+        store_id=sample_store.id,
+        table_number="1",
+        password_hash=hash_password("table123")
+    )
+    db.add(table)
+    db.commit()
+    db.refresh(table)
+    return table
+
+@pytest.fixture
+def sample_session(db, sample_table):
+    session = TableSession(
+        table_auth_id=sample_table.id,
+        session_token="test-session-token",
+        is_active=True
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+@pytest.fixture
+def sample_menu(db, sample_store):
+    category = Category(store_id=sample_store.id, name="Main")
+    db.add(category)
+    db.flush()
+    menu = Menu(
+        store_id=sample_store.id,
+        category_id=category.id,
+        name="Bulgogi",
+        price=15000
+    )
+    db.add(menu)
+    db.commit()
+    db.refresh(menu)
+    return menu
+
 # TC-BS-001: Valid admin login
 def test_admin_login_success(db, sample_admin):
     auth_service = AuthService(db)
@@ -70,6 +106,37 @@ def test_admin_login_account_lock(db, sample_admin):
     with pytest.raises(AccountLockedError):
         auth_service.login_admin(sample_admin.store_id, "admin", "wrongpassword")
 
+# TC-BS-056: Failed logins are counted with one atomic UPDATE; success only writes after failures
+def test_failed_login_counter_is_atomic(db, sample_admin):
+    auth_service = AuthService(db)
+    store_id, admin_id = sample_admin.store_id, sample_admin.id
+    with track_queries() as queries:
+        with pytest.raises(AuthenticationError):
+            auth_service.login_admin(store_id, "admin", "wrongpassword")
+    assert sum(n for sql, n in queries.statements.items() if sql.startswith("UPDATE admin_users")) == 1
+    assert db.query(AdminUser.failed_login_attempts).filter(AdminUser.id == admin_id).scalar() == 1
+    
+    auth_service.login_admin(store_id, "admin", "password123")
+    assert db.query(AdminUser.failed_login_attempts).filter(AdminUser.id == admin_id).scalar() == 0
+    with track_queries() as queries:
+        auth_service.login_admin(store_id, "admin", "password123")
+    assert not any(sql.startswith("UPDATE") for sql in queries.statements)
+
+# TC-BS-033: Password checks run in the pool and fail fast when saturated
+def test_password_pool_verify_and_admission():
+    pool = PasswordPool(workers=1, max_pending=1)
+    hashed = hash_password("password123")
+    try:
+        assert pool.verify("password123", hashed)
+        assert not pool.verify("wrongpassword", hashed)
+        
+        pool._slots.acquire()
+        with pytest.raises(PasswordPoolBusyError):
+            pool.verify("password123", hashed)
+        pool._slots.release()
+    finally:
+        pool.shutdown()
+
 # TC-BS-012: Create menu with valid data
 def test_create_menu_success(db, sample_store):
     category = Category(store_id=sample_store.id, name="Main")
@@ -102,5 +169,570 @@ def test_create_menu_invalid_price(db, sample_store):
             price=-1000
         )
 
+# TC-BS-009: Verified sessions are cached and dropped when the session closes
+def test_verify_session_token_cached_until_closed(db, sample_session):
+    auth_service = AuthService(db)
+    verified = auth_service.verify_session_token(sample_session.session_token)
+    assert verified.store_id == sample_session.table_auth.store_id
+    assert auth_service.verify_session_token(sample_session.session_token) is verified
+    
+    SessionService(db).close_session(sample_session.id)
+    with pytest.raises(SessionExpiredError):
+        auth_service.verify_session_token(sample_session.session_token)
+
+# TC-BS-017: Ordering updates last_order_at and refreshes the cached expiry
+def test_create_order_updates_last_order_at(db, sample_session, sample_menu):
+    auth_service = AuthService(db)
+    verified = auth_service.verify_session_token(sample_session.session_token)
+    assert verified.last_order_at is None
+    
+    OrderService(db).create_order(
+        sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 1}], session=verified
+    )
+    refreshed = auth_service.verify_session_token(sample_session.session_token)
+    assert refreshed is not verified
+    assert refreshed.last_order_at is not None
+    assert refreshed.expires_at < verified.expires_at
+
+# TC-BS-018: expired_at follows login and ordering; expiry no longer writes on verify
+def test_session_expired_at_maintained(db, sample_table, sample_menu):
+    auth_service = AuthService(db)
+    token = auth_service.login_table(sample_table.store_id, "1", "table123")
+    session = db.query(TableSession).filter(TableSession.session_token == token).one()
+    assert session.expired_at == session.created_at + timedelta(hours=16)
+    
+    OrderService(db).create_order(token, [{"menu_id": sample_menu.id, "quantity": 1}])
+    db.refresh(session)
+    assert session.expired_at == session.last_order_at + timedelta(hours=2)
+    
+    session.expired_at = datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+    session_cache.clear()
+    with pytest.raises(SessionExpiredError):
+        auth_service.verify_session_token(token)
+    db.refresh(session)
+    assert session.is_active
+
+# TC-BS-019: Sweeper deactivates only sessions past expired_at, backfilling old rows
+def test_expire_sessions_sweep(db, sample_table):
+    now = datetime.utcnow()
+    sessions = [
+        TableSession(table_auth_id=sample_table.id, session_token="stale", is_active=True,
+                     created_at=now - timedelta(hours=3), expired_at=now - timedelta(hours=1)),
+        TableSession(table_auth_id=sample_table.id, session_token="fresh", is_active=True,
+                     created_at=now, expired_at=now + timedelta(hours=16)),
+        TableSession(table_auth_id=sample_table.id, session_token="legacy", is_active=True,
+                     created_at=now - timedelta(hours=20)),
+    ]
+    db.add_all(sessions)
+    db.commit()
+    
+    assert SessionService(db).expire_sessions() == 2
+    active = {s.session_token for s in db.query(TableSession).filter(TableSession.is_active == True)}
+    assert active == {"fresh"}
+    assert SessionService(db).expire_sessions() == 0
+
+# TC-BS-020: Closing all sessions of a store is one UPDATE and notifies the admin stream
+def test_close_store_sessions(db, query_budget, sample_table, sample_session):
+    other_store = Store(name="Other Store")
+    db.add(other_store)
+    db.flush()
+    other_table = TableAuth(store_id=other_store.id, table_number="9", password_hash="x")
+    db.add(other_table)
+    db.flush()
+    db.add(TableSession(table_auth_id=other_table.id, session_token="other", is_active=True))
+    db.add(TableSession(table_auth_id=sample_table.id, session_token="second", is_active=True))
+    db.commit()
+    
+    AuthService(db).verify_session_token("second")
+    before = order_events._last_id
+    with query_budget(3):
+        closed = SessionService(db).close_store_sessions(sample_table.store_id)
+    
+    assert closed == 2
+    assert session_cache.get("second") is None
+    still_active = {s.session_token for s in db.query(TableSession).filter(TableSession.is_active == True)}
+    assert still_active == {"other"}
+    events = [e for e in order_events._history[sample_table.store_id] if e.id > before]
+    assert [e.event for e in events] == ["session-closed", "session-closed"]
+
+# TC-BS-021: Orders keep running totals on the session and per-table overview
+def test_session_running_totals(db, query_budget, sample_table, sample_session, sample_menu):
+    session_id, store_id = sample_session.id, sample_table.store_id
+    order_service = OrderService(db)
+    order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 2}])
+    order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 1}])
+    
+    session_service = SessionService(db)
+    with query_budget(1):
+        summary = session_service.get_session_summary(session_id)
+    assert (summary["order_count"], summary["total_amount"], summary["item_count"]) == (2, 45000, 3)
+    
+    db.add(TableAuth(store_id=store_id, table_number="2", password_hash="x"))
+    db.commit()
+    with query_budget(1):
+        overview = session_service.get_table_overview(store_id)
+    assert [(t["table_number"], t["active_sessions"], t["total_amount"]) for t in overview] == [
+        ("1", 1, 45000), ("2", 0, 0)
+    ]
+    
+    session_service.close_session(session_id)
+    assert session_service.get_table_overview(store_id)[0]["order_count"] == 0
+
+# TC-BS-014: Valid order with several items is priced from the menus
+def test_create_order_multiple_items(db, sample_session, sample_menu):
+    side = Menu(
+        store_id=sample_menu.store_id,
+        category_id=sample_menu.category_id,
+        name="Kimchi",
+        price=3000
+    )
+    db.add(side)
+    db.commit()
+    
+    order = OrderService(db).create_order(sample_session.session_token, [
+        {"menu_id": sample_menu.id, "quantity": 2},
+        {"menu_id": side.id, "quantity": 3}
+    ])
+    assert order.total_amount == 15000 * 2 + 3000 * 3
+    assert sorted(item.menu_name for item in order.order_items) == ["Bulgogi", "Kimchi"]
+
+# TC-BS-014: Repeat orders from one session get distinct order numbers
+def test_create_order_twice_in_same_session(db, sample_session, sample_menu):
+    order_service = OrderService(db)
+    items = [{"menu_id": sample_menu.id, "quantity": 1}]
+    first = order_service.create_order(sample_session.session_token, items)
+    second = order_service.create_order(sample_session.session_token, items)
+    assert first.order_number != second.order_number
+    assert first.order_number.endswith("-0001")
+    assert second.order_number.endswith("-0002")
+
+def test_order_number_blocks_do_not_collide(db, sample_store):
+    now = datetime(2026, 1, 1)
+    bind = db.get_bind()
+    worker_a = OrderNumberAllocator(block_size=2)
+    worker_b = OrderNumberAllocator(block_size=2)
+    numbers = [
+        worker_a.next_number(bind, sample_store.id, now),
+        worker_b.next_number(bind, sample_store.id, now),
+        worker_a.next_number(bind, sample_store.id, now),
+        worker_a.next_number(bind, sample_store.id, now),
+        worker_b.next_number(bind, sample_store.id, now),
+    ]
+    assert len(set(numbers)) == len(numbers)
+    assert numbers[0] == f"ORD-20260101-{sample_store.id}-0001"
+    assert numbers[3].endswith("-0005")
+    assert worker_a.next_number(bind, 999, now) == "ORD-20260101-999-0001"
+
+def test_order_number_engines(db, sample_store):
+    now = datetime(2026, 1, 1)
+    allocator = OrderNumberAllocator(block_size=2)
+    # Binds to the same database share one reservation engine
+    other_bind = create_engine(db.get_bind().url)
+    allocator.next_number(db.get_bind(), sample_store.id, now)
+    allocator.next_number(other_bind, 999, now)
+    assert len(allocator._engines) == 1
+    allocator.reset()
+    other_bind.dispose()
+    
+    # A second engine on an in-memory database would see another, empty database
+    memory = create_engine("sqlite://")
+    Base.metadata.create_all(bind=memory)
+    with pytest.raises(RuntimeError, match="in-memory"):
+        OrderNumberAllocator().next_number(memory, 1, now)
+    assert OrderNumberAllocator(engine=memory).next_number(memory, 1, now) == "ORD-20260101-1-0001"
+    memory.dispose()
+
+# TC-BS-016: Missing, unavailable and other-store menus are rejected up front
+def test_create_order_rejects_invalid_menus(db, sample_session, sample_menu):
+    other_store = Store(name="Other Store")
+    db.add(other_store)
+    db.flush()
+    foreign = Menu(
+        store_id=other_store.id,
+        category_id=sample_menu.category_id,
+        name="Foreign",
+        price=1000
+    )
+    sold_out = Menu(
+        store_id=sample_menu.store_id,
+        category_id=sample_menu.category_id,
+        name="Sold Out",
+        price=1000,
+        is_available=False
+    )
+    db.add_all([foreign, sold_out])
+    db.commit()
+    
+    order_service = OrderService(db)
+    for menu_id in (9999, foreign.id, sold_out.id):
+        with pytest.raises(ValidationError):
+            order_service.create_order(
+                sample_session.session_token,
+                [{"menu_id": sample_menu.id, "quantity": 1}, {"menu_id": menu_id, "quantity": 1}]
+            )
+    with pytest.raises(ValidationError):
+        order_service.create_order(
+            sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 0}]
+        )
+    assert db.query(Order).count() == 0
+
+# TC-BS-025: Admin order list pages with a (created_at, id) cursor
+def test_get_orders_by_store_keyset_pagination(db, sample_session):
+    base = datetime(2026, 1, 1, 12, 0)
+    for i in range(5):
+        db.add(Order(
+            store_id=sample_session.table_auth.store_id,
+            table_session_id=sample_session.id,
+            order_number=f"ORD-TEST-{i}",
+            total_amount=1000,
+            status=OrderStatus.COMPLETED if i % 2 else OrderStatus.PENDING,
+            created_at=base + timedelta(minutes=i // 2)
+        ))
+    db.commit()
+    
+    order_service = OrderService(db)
+    store_id = sample_session.table_auth.store_id
+    seen = []
+    cursor = None
+    while True:
+        page = order_service.get_orders_by_store(store_id, cursor=cursor, limit=2)
+        seen.extend(order["order_number"] for order in page["orders"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [f"ORD-TEST-{i}" for i in (4, 3, 2, 1, 0)]
+    
+    pending = order_service.get_orders_by_store(store_id, status="pending", table_number="1")
+    assert [o["order_number"] for o in pending["orders"]] == ["ORD-TEST-4", "ORD-TEST-2", "ORD-TEST-0"]
+    assert order_service.get_orders_by_store(store_id, table_number="99")["orders"] == []
+    with pytest.raises(ValidationError):
+        order_service.get_orders_by_store(store_id, cursor="garbage")
+
+# TC-BS-011: Menu snapshot is reused until a menu write invalidates it
+def test_menu_snapshot_invalidated_by_menu_writes(db, sample_menu):
+    menu_service = MenuService(db)
+    first = menu_service.get_menu_snapshot(sample_menu.store_id)
+    assert menu_service.get_menu_snapshot(sample_menu.store_id) is first
+    assert b"Bulgogi" in first.body
+    
+    menu_service.update_menu(sample_menu.id, name="Galbi")
+    second = menu_service.get_menu_snapshot(sample_menu.store_id)
+    assert second.etag != first.etag
+    assert b"Galbi" in second.body
+    
+    menu_service.delete_menu(sample_menu.id)
+    assert b"Galbi" not in menu_service.get_menu_snapshot(sample_menu.store_id).body
+
+# TC-BS-046: Menu batch applies create/update/reorder/delete in one transaction
+def test_apply_menu_batch(db, query_budget, sample_menu):
+    store_id = sample_menu.store_id
+    category_id = sample_menu.category_id
+    extra = Menu(store_id=store_id, category_id=category_id, name="Japchae", price=9000)
+    db.add(extra)
+    db.commit()
+    menu_id, extra_id = sample_menu.id, extra.id
+    menu_service = MenuService(db)
+    before = menu_service.get_menu_snapshot(store_id)
+    
+    version = menu_service.menu_version(store_id)
+    
+    # 2 validation reads, insert, update, delete, 2 reads rebuilding the snapshot, version
+    with query_budget(8):
+        result = menu_service.apply_menu_batch(store_id, [
+            {"op": "create", "category_id": category_id, "name": "Bibimbap", "price": 11000},
+            {"op": "update", "menu_id": menu_id, "price": 16000, "is_available": False},
+            {"op": "reorder", "menu_id": menu_id, "display_order": 5},
+            {"op": "delete", "menu_id": extra_id},
+        ])
+    
+    assert result["updated"] == 1 and result["deleted"] == 1
+    assert result["etag"] != before.etag and result["version"] != version
+    # Derived from the stored rows, so every worker reports the same version
+    menu_cache.clear()
+    assert MenuService(db).menu_version(store_id) == result["version"]
+    db.expire_all()
+    created = db.query(Menu).filter(Menu.id == result["created_ids"][0]).one()
+    assert (created.name, created.store_id, created.is_available) == ("Bibimbap", store_id, True)
+    menu = db.query(Menu).filter(Menu.id == menu_id).one()
+    assert (menu.price, menu.is_available, menu.display_order) == (16000, False, 5)
+    assert db.query(Menu).filter(Menu.id == extra_id).first() is None
+
+# TC-BS-047: Any invalid operation rejects the whole batch before writing
+def test_apply_menu_batch_validates_up_front(db, sample_menu):
+    menu_service = MenuService(db)
+    with pytest.raises(ValidationError) as excinfo:
+        menu_service.apply_menu_batch(sample_menu.store_id, [
+            {"op": "update", "menu_id": sample_menu.id, "price": 20000},
+            {"op": "update", "menu_id": sample_menu.id, "price": -1},
+            {"op": "delete", "menu_id": 999},
+            {"op": "create", "category_id": sample_menu.category_id, "name": "No price"},
+        ])
+    assert "operations[1]" in str(excinfo.value)
+    assert "operations[2]" in str(excinfo.value)
+    assert "operations[3]" in str(excinfo.value)
+    
+    with pytest.raises(ValidationError) as excinfo:
+        menu_service.apply_menu_batch(sample_menu.store_id, [
+            {"op": "delete", "menu_id": sample_menu.id},
+            {"op": "delete", "menu_id": sample_menu.id},
+            {"op": "update", "menu_id": sample_menu.id, "name": None},
+        ])
+    assert "operations[1]: Menu is deleted twice" in str(excinfo.value)
+    assert "operations[2]: name cannot be null" in str(excinfo.value)
+    
+    db.expire_all()
+    assert db.query(Menu.price).filter(Menu.id == sample_menu.id).scalar() == 15000
+    
+    # Optional fields are cleared by sending null
+    sample_menu.description = "Grilled"
+    db.commit()
+    menu_service.apply_menu_batch(sample_menu.store_id, [
+        {"op": "update", "menu_id": sample_menu.id, "description": None}
+    ])
+    db.expire_all()
+    assert db.query(Menu.description).filter(Menu.id == sample_menu.id).scalar() is None
+
+# TC-BS-048: Completing orders feeds the sales rollup; a windowed rebuild gives the same totals
+def test_sales_rollup_incremental_and_backfill(db, sample_session, sample_menu):
+    store_id = sample_menu.store_id
+    order_service = OrderService(db)
+    orders = [
+        order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": q}])
+        for q in (1, 2, 3)
+    ]
+    for order in orders:
+        order_service.update_order_status(order.id, "preparing")
+    for order in orders[:2]:
+        order_service.update_order_status(order.id, "completed")
+    
+    report_service = ReportService(db)
+    today = datetime.utcnow().date()
+    by_menu = report_service.get_sales(store_id, today, today)
+    assert [(r["menu_name"], r["quantity"], r["revenue"], r["order_count"]) for r in by_menu] == [
+        ("Bulgogi", 3, 45000, 2)
+    ]
+    
+    order_service.update_order_status(orders[2].id, "completed")
+    expected = report_service.get_sales(store_id, today, today, granularity="hour")
+    assert expected[0]["quantity"] == 6
+    
+    assert report_service.rebuild_sales_rollups(days=1) == {"orders": 3, "rows": 1}
+    assert report_service.get_sales(store_id, today, today, granularity="hour") == expected
+    by_category = report_service.get_sales(store_id, today, today, group_by="category")
+    assert [(r["category_name"], r["revenue"]) for r in by_category] == [("Main", 90000)]
+    assert "order_count" not in by_category[0]
+    
+    # Stale buckets without orders behind them are dropped by the rebuild
+    db.add(SalesRollup(
+        store_id=store_id, sales_date=today - timedelta(days=30), hour=0, menu_id=sample_menu.id,
+        menu_name="Bulgogi", quantity=1, revenue=15000, order_count=1
+    ))
+    db.commit()
+    assert report_service.rebuild_sales_rollups() == {"orders": 3, "rows": 1}
+    
+    with pytest.raises(ValidationError):
+        report_service.get_sales(store_id, today, today, group_by="table")
+
+# TC-BS-051: Archiving moves finished orders out of the hot tables; history still reads them
+def test_archive_orders_and_union_reads(db, sample_table, sample_session, sample_menu):
+    store_id = sample_menu.store_id
+    order_service = OrderService(db)
+    ids = [
+        order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": q}]).id
+        for q in (1, 2, 3)
+    ]
+    for order_id in ids[:2]:
+        order_service.update_order_status(order_id, "preparing")
+        order_service.update_order_status(order_id, "completed")
+    
+    archive_service = ArchiveService(db)
+    future = datetime.utcnow() + timedelta(hours=1)
+    assert archive_service.archive_orders(future) == 0  # session still open
+    SessionService(db).close_session(sample_session.id)
+    assert archive_service.archive_orders(future, batch_size=1) == 2
+    
+    assert [o.id for o in db.query(Order)] == [ids[2]]
+    assert db.query(OrderItem).count() == 1
+    assert sorted(o.id for o in db.query(ArchivedOrder)) == ids[:2]
+    assert db.query(ArchivedOrderItem).count() == 2
+    
+    first = order_service.get_orders_by_store(store_id, limit=2)
+    second = order_service.get_orders_by_store(store_id, limit=2, cursor=first["next_cursor"])
+    pages = first["orders"] + second["orders"]
+    assert [o["id"] for o in pages] == ids[::-1]
+    assert [o["order_items"][0]["quantity"] for o in pages] == [3, 2, 1]
+    assert second["next_cursor"] is None
+    
+    exported = [row.order_id for rows in order_service.export_orders(store_id) for row in rows]
+    assert exported == ids
+    report_service = ReportService(db)
+    assert report_service.rebuild_sales_rollups() == {"orders": 2, "rows": 1}
+    today = datetime.utcnow().date()
+    assert report_service.get_sales(store_id, today, today)[0]["revenue"] == 45000
+
+# TC-BS-052: Kitchen board tracks outstanding quantities and matches a rebuild from the DB
+def test_kitchen_board(db, sample_session, sample_menu):
+    store_id = sample_menu.store_id
+    side = Menu(store_id=store_id, category_id=sample_menu.category_id, name="Kimchi", price=3000)
+    db.add(side)
+    db.commit()
+    order_service = OrderService(db)
+    first = order_service.create_order(sample_session.session_token, [
+        {"menu_id": sample_menu.id, "quantity": 2}, {"menu_id": side.id, "quantity": 1}
+    ])
+    second = order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 1}])
+    order_service.update_order_status(first.id, "preparing")
+    
+    board = kitchen_board.outstanding(store_id)
+    assert [(r["menu_name"], r["pending"], r["preparing"], r["total"]) for r in board] == [
+        ("Bulgogi", 1, 2, 3), ("Kimchi", 0, 1, 1)
+    ]
+    kitchen_board.clear()
+    assert kitchen_board.rebuild(db) == 2
+    assert kitchen_board.outstanding(store_id) == board
+    
+    order_service.update_order_status(first.id, "completed")
+    assert [(r["menu_id"], r["total"]) for r in kitchen_board.outstanding(store_id)] == [(sample_menu.id, 1)]
+    order_service.update_order_status(second.id, "preparing")
+    order_service.update_order_status(second.id, "completed")
+    assert kitchen_board.outstanding(store_id) == []
+
+# TC-BS-064: Orders created or completed while the board rebuilds are not lost or left behind
+def test_kitchen_board_rebuild_replays_concurrent_changes():
+    board = KitchenBoard()
+    board.order_created(1, 10, [(1, "Bulgogi", 2)])
+    # The rebuild's query saw order 10 still pending and not order 11 yet
+    rows = [SimpleNamespace(id=10, store_id=1, status=OrderStatus.PENDING, menu_id=1, menu_name="Bulgogi", quantity=2)]
+    
+    class Query:
+        def join(self, *args):
+            return self
+        filter = join
+        def all(self):
+            board.order_created(1, 11, [(2, "Kimchi", 1)])
+            board.status_changed(10, OrderStatus.COMPLETED)
+            return rows
+    
+    assert board.rebuild(SimpleNamespace(query=lambda *columns: Query())) == 1
+    assert [(r["menu_name"], r["pending"]) for r in board.outstanding(1)] == [("Kimchi", 1)]
+    # Later changes apply normally once the rebuild is done
+    board.status_changed(11, OrderStatus.PREPARING)
+    assert [(r["menu_name"], r["preparing"]) for r in board.outstanding(1)] == [("Kimchi", 1)]
+
+# TC-BS-053: Bulk status change is one conditional UPDATE reporting per-id conflicts
+def test_bulk_status_compare_and_set(db, query_budget, sample_session, sample_menu):
+    store_id = sample_menu.store_id
+    order_service = OrderService(db)
+    ids = [
+        order_service.create_order(sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 1}]).id
+        for _ in range(4)
+    ]
+    order_service.update_order_status(ids[0], "preparing")
+    
+    # UPDATE ... RETURNING, then one read for the ids that did not move
+    with query_budget(2):
+        result = order_service.update_order_statuses(ids + [999], "preparing", store_id=store_id)
+    assert [o["id"] for o in result["updated"]] == ids[1:]
+    assert {o["status"] for o in result["updated"]} == {OrderStatus.PREPARING}
+    assert result["conflicts"] == [
+        {"order_id": ids[0], "current_status": OrderStatus.PREPARING},
+        {"order_id": 999, "current_status": None}
+    ]
+    
+    # A second admin repeating the same transition changes nothing
+    again = order_service.update_order_statuses(ids[1:], "preparing")
+    assert again["updated"] == [] and len(again["conflicts"]) == 3
+    with pytest.raises(InvalidStatusTransitionError):
+        order_service.update_order_status(ids[1], "preparing")
+    with pytest.raises(ValidationError):
+        order_service.update_order_statuses(ids, "served")
+    
+    assert len(order_service.update_order_statuses(ids, "completed", store_id=store_id)["updated"]) == 4
+    today = datetime.utcnow().date()
+    assert ReportService(db).get_sales(store_id, today, today)[0]["order_count"] == 4
+    assert order_service.update_order_statuses(ids, "completed", store_id=store_id + 1)["updated"] == []
+
+# TC-BS-031: Order lifecycle publishes admin stream events
+def test_order_lifecycle_publishes_events(db, sample_session, sample_menu):
+    before = order_events._last_id
+    order_service = OrderService(db)
+    order = order_service.create_order(
+        sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 2}]
+    )
+    order_service.update_order_status(order.id, "preparing")
+    SessionService(db).close_session(sample_session.id)
+    
+    history = [e for e in order_events._history[order.store_id] if e.id > before]
+    assert [e.event for e in history] == ["order-created", "order-updated", "session-closed"]
+
+# TC-BS-036: Async service facade runs the same logic on an AsyncSession
+@pytest.mark.asyncio
+async def test_async_order_service(db, database_url, sample_session, sample_menu):
+    token = sample_session.session_token
+    menu_id = sample_menu.id
+    db.commit()
+    
+    async_engine = create_async_engine(to_async_url(database_url))
+    try:
+        async with AsyncSession(async_engine) as async_db:
+            order_service = AsyncOrderService(async_db)
+            order = await order_service.create_order(token, [{"menu_id": menu_id, "quantity": 2}])
+            orders = await order_service.get_orders_by_session(token)
+    finally:
+        await async_engine.dispose()
+    
+    assert order.total_amount == 30000
+    assert [o["id"] for o in orders] == [order.id]
+    # Items were loaded inside run_db, so reading them here needs no IO
+    assert [(item.menu_id, item.quantity, item.subtotal) for item in order.order_items] == [
+        (menu_id, 2, 30000)
+    ]
+    assert [item["quantity"] for item in orders[0]["order_items"]] == [2]
+
+# TC-BS-039: Business counters track created orders and failed logins
+def test_business_counters(db, sample_table, sample_session, sample_menu):
+    orders_before = metrics.orders_created.value()
+    failed_before = metrics.logins_failed.value("table", "bad_password")
+    
+    OrderService(db).create_order(
+        sample_session.session_token, [{"menu_id": sample_menu.id, "quantity": 1}]
+    )
+    with pytest.raises(AuthenticationError):
+        AuthService(db).login_table(sample_table.store_id, sample_table.table_number, "wrong")
+    
+    assert metrics.orders_created.value() == orders_before + 1
+    assert metrics.logins_failed.value("table", "bad_password") == failed_before + 1
+
+# TC-BS-040: Hot service methods stay within their query budgets
+def test_service_query_budgets(db, query_budget, sample_session, sample_menu):
+    token = sample_session.session_token
+    store_id = sample_menu.store_id
+    items = [{"menu_id": sample_menu.id, "quantity": 2}]
+    auth_service = AuthService(db)
+    order_service = OrderService(db)
+    
+    with query_budget(1):
+        session = auth_service.verify_session_token(token)
+    with query_budget(0):
+        auth_service.verify_session_token(token)
+    # menus, order number block, order, items, last_order_at, refresh, items for the event
+    with query_budget(8):
+        order_id = order_service.create_order(token, items, session=session).id
+    for _ in range(3):
+        order_service.create_order(token, items)
+    with query_budget(3):
+        orders = order_service.get_orders_by_session(token)
+    # Page with the archive watermark, then its items
+    with query_budget(2):
+        page = order_service.get_orders_by_store(store_id, limit=2)
+    with query_budget(2):
+        order_service.get_orders_by_store(store_id, limit=2, cursor=page["next_cursor"])
+    # One conditional UPDATE ... RETURNING
+    with query_budget(1):
+        order_service.update_order_status(order_id, "preparing")
+    
+    assert len(orders) == 4 and len(page["orders"]) == 2
+
 # Add more test cases following the test plan...
 # TC-BS-014 to TC-BS-036 would be implemented here
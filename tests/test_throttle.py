@@ -0,0 +1,67 @@
+"""Test cases for login throttling"""
+import pytest
+from src import throttle
+from src.throttle import TokenBucketLimiter, LoginThrottle, LoginThrottledError, client_address
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now[0])
+    return now
+
+# TC-BS-054: Buckets allow a burst, then refill at the configured rate per key
+def test_token_bucket_burst_and_refill(clock):
+    limiter = TokenBucketLimiter(burst=3, per_minute=6)
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(10.0)
+    assert limiter.acquire("b") == 0.0
+
+    clock[0] += 10
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+
+# TC-BS-055: Client and account limits reject attempts with a Retry-After hint
+def test_login_throttle_limits(clock, monkeypatch):
+    monkeypatch.setattr(throttle.config, "LOGIN_THROTTLE_ENABLED", True)
+    login_throttle = LoginThrottle()
+    login_throttle.by_client = TokenBucketLimiter(burst=4, per_minute=60)
+    login_throttle.by_account = TokenBucketLimiter(burst=2, per_minute=2)
+
+    for _ in range(2):
+        login_throttle.check("10.0.0.1", ("table", 1, "1"))
+    with pytest.raises(LoginThrottledError) as excinfo:
+        login_throttle.check("10.0.0.1", ("table", 1, "1"))
+    assert excinfo.value.retry_after == 30
+
+    # Another table from the same address still has client budget left, then runs out
+    login_throttle.check("10.0.0.1", ("table", 1, "2"))
+    with pytest.raises(LoginThrottledError):
+        login_throttle.check("10.0.0.1", ("table", 1, "3"))
+    login_throttle.check("10.0.0.2", ("table", 1, "3"))
+
+# TC-BS-065: Successful logins refund their tokens; only failures use up the budget
+def test_login_throttle_refunds_successful_logins(clock, monkeypatch):
+    monkeypatch.setattr(throttle.config, "LOGIN_THROTTLE_ENABLED", True)
+    login_throttle = LoginThrottle()
+    login_throttle.by_client = TokenBucketLimiter(burst=2, per_minute=1)
+    login_throttle.by_account = TokenBucketLimiter(burst=2, per_minute=1)
+
+    # Opening time: the same tablet logs in again and again
+    for _ in range(5):
+        login_throttle.check("10.0.0.1", ("table", 1, "1"))
+        login_throttle.succeeded("10.0.0.1", ("table", 1, "1"))
+    for _ in range(2):
+        login_throttle.check("10.0.0.1", ("table", 1, "1"))
+    with pytest.raises(LoginThrottledError):
+        login_throttle.check("10.0.0.1", ("table", 1, "1"))
+
+# TC-BS-066: X-Forwarded-For names the client only when the peer is a trusted proxy
+def test_client_address_behind_trusted_proxy():
+    proxies = ["10.0.0.0/8"]
+    assert client_address("10.0.0.5", "203.0.113.7", proxies) == "203.0.113.7"
+    # Hops added by trusted proxies are skipped; a spoofed leftmost entry is not reached
+    assert client_address("10.0.0.5", "1.2.3.4, 203.0.113.7, 10.0.0.9", proxies) == "203.0.113.7"
+    # From an untrusted peer the header is ignored
+    assert client_address("198.51.100.1", "203.0.113.7", proxies) == "198.51.100.1"
+    assert client_address("10.0.0.5", "203.0.113.7", []) == "10.0.0.5"
+    assert client_address("10.0.0.5", None, proxies) == "10.0.0.5"